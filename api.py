@@ -0,0 +1,390 @@
+"""
+HTTP API for resume analysis, job matching and candidate search.
+
+An ASGI application (Starlette) that lets other systems, such as an ATS,
+submit resumes programmatically. It runs alongside the Streamlit UI on the
+same database:
+
+    uvicorn api:app --port 8000
+
+Endpoints:
+
+    POST /analyze                    multipart: file, optional save=true
+    POST /match                      multipart: file, optional job_id
+                                     or JSON: {"resume_id": ..., "job_id": ...}
+    GET  /jobs/{job_id}/candidates   ?top_k=10
+    GET  /health
+
+Every endpoint but /health needs an API key, sent as
+"Authorization: Bearer <key>" (or "X-API-Key: <key>"). The key decides the
+user: saved resumes belong to it, stored resumes can only be matched by
+their owner or by the recruiter who posted the job, and only that
+recruiter sees a job's candidates. Keys are created and revoked with:
+
+    python -m api create-key <username> [--name ats]
+    python -m api revoke-key <key>
+
+Uploads are streamed by the multipart parser into spooled temporary files.
+The request body is counted as it arrives and the request is rejected with
+413 as soon as it passes MAX_UPLOAD_BYTES (plus a little room for the form
+encoding), whatever its Content-Length says. Uploads saved for a user are
+then copied in chunks into the blob store (see utils/blob_store.py);
+anonymous ones are sent to the parser from memory. Parsing runs in a
+process pool so the event loop stays free. At most max_pending analyses
+are admitted at a time; further requests get 503 with Retry-After instead
+of piling up in memory.
+
+For local testing, use Starlette's in-process client (requires httpx):
+
+    from starlette.testclient import TestClient
+    with TestClient(create_app(db_path="test.db", workers=1)) as client:
+        client.post("/analyze", files={"file": open("resume.pdf", "rb")},
+                    headers={"Authorization": f"Bearer {key}"})
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from database.connection import DEFAULT_DB_PATH
+from database.db_manager import DatabaseManager
+from utils.batch_analyzer import SUPPORTED_EXTENSIONS
+from utils.candidate_search import DEFAULT_TOP_K, search_candidates
+from utils.incremental_matcher import start_incremental_matching, stop_incremental_matching
+from utils.job_matcher import get_job_matcher
+from utils.resume_parser import match_resume_to_job
+from utils.blob_store import store_upload
+from utils.uploads import MAX_UPLOAD_BYTES, UploadTooLarge
+
+# Analyses admitted at once, per worker process
+PENDING_PER_WORKER = 4
+
+# Jobs returned by /match when no job_id is given
+DEFAULT_MATCH_LIMIT = 10
+
+# Room for multipart boundaries, part headers and the small form fields
+FORM_OVERHEAD_BYTES = 64 * 1024
+MAX_FORM_FIELDS = 10
+
+
+def _init_worker():
+    """Load the skill taxonomy once per worker process"""
+    from utils.resume_parser import get_taxonomy
+    get_taxonomy()
+
+
+def _analyze_file(source, filename, content_hash=None):
+    """Analyze a resume (a path or its bytes) inside a worker process; the parent saves the result"""
+    from utils.resume_parser import analyze_resume
+    try:
+        return analyze_resume(source, filename=filename, content_hash=content_hash)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+def _error(message, status_code, headers=None):
+    return JSONResponse({"status": "error", "message": message}, status_code=status_code, headers=headers)
+
+
+def _int_param(value, name):
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+
+
+def _api_key(request):
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token.strip():
+        return token.strip()
+    return request.headers.get("x-api-key")
+
+
+def _authenticated(handler):
+    """Require a valid API key; its user is available as request.state.user"""
+    async def wrapper(request):
+        key = _api_key(request)
+        user = await run_in_threadpool(request.app.state.db.get_api_key_user, key) if key else None
+        if user is None:
+            return _error("A valid API key is required", 401, headers={"WWW-Authenticate": "Bearer"})
+        request.state.user = user
+        return await handler(request)
+    return wrapper
+
+
+def _bounded(handler):
+    """Reject requests with 503 while max_pending analyses are in flight"""
+    async def wrapper(request):
+        slots = request.app.state.slots
+        if slots.locked():
+            return _error("Server is busy, retry shortly", 503, headers={"Retry-After": "1"})
+        async with slots:
+            return await handler(request)
+    return wrapper
+
+
+async def _receive_resume(request, form, user_id=None):
+    """Read the form's resume file; returns (filename, source, content_hash)
+
+    Files of users are saved in the blob store, like uploads from the UI,
+    and source is their path; content_hash is the SHA-256 computed while
+    storing them. Anonymous files are not written to disk; source is their
+    contents and content_hash is None.
+    """
+    upload = form.get("file")
+    if not isinstance(upload, UploadFile) or not upload.filename:
+        raise ValueError("A resume file is required in the 'file' field")
+
+    filename = os.path.basename(upload.filename)
+    if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        raise ValueError("Only PDF and DOCX resumes are supported")
+
+    max_bytes = request.app.state.max_upload_bytes
+    if user_id is None:
+        data = await upload.read(max_bytes + 1)
+        if len(data) > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        return filename, data, None
+
+    content_hash, file_path = await run_in_threadpool(store_upload, upload.file, filename, max_bytes=max_bytes)
+    return filename, file_path, content_hash
+
+
+async def _analyze(request, source, filename, content_hash=None):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(request.app.state.executor, _analyze_file, source, filename, content_hash)
+
+
+def _max_body_bytes(request):
+    return request.app.state.max_upload_bytes + FORM_OVERHEAD_BYTES
+
+
+def _too_large(request):
+    content_length = request.headers.get("content-length")
+    return content_length is not None and content_length.isdigit() \
+        and int(content_length) > _max_body_bytes(request)
+
+
+def _capped(request):
+    """Wrap a request so reading more than the body limit raises UploadTooLarge
+
+    Unlike the Content-Length check this also covers chunked bodies and
+    clients that under-report their size, before the form parser has
+    spooled the excess anywhere.
+    """
+    max_bytes = _max_body_bytes(request)
+    received = 0
+
+    async def receive():
+        nonlocal received
+        message = await request.receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > max_bytes:
+                raise UploadTooLarge(request.app.state.max_upload_bytes)
+        return message
+
+    return Request(request.scope, receive)
+
+
+@_authenticated
+@_bounded
+async def analyze(request):
+    """Analyze an uploaded resume; with save=true it is saved for the API key's user"""
+    if _too_large(request):
+        return _error("Upload is too large", 413)
+
+    db = request.app.state.db
+    request = _capped(request)
+    try:
+        async with request.form(max_files=1, max_fields=MAX_FORM_FIELDS) as form:
+            save = str(form.get("save", "")).lower() in ("1", "true", "yes")
+            user_id = request.state.user["id"] if save else None
+            filename, source, content_hash = await _receive_resume(request, form, user_id)
+    except UploadTooLarge as e:
+        return _error(str(e), 413)
+    except ValueError as e:
+        return _error(str(e), 400)
+
+    analysis = await _analyze(request, source, filename, content_hash)
+    if analysis["status"] != "success":
+        # A stored file left without a resume is removed by blob garbage collection
+        return _error(analysis["message"], 422)
+
+    if user_id is not None:
+        [(resume_id, analysis_id)] = await run_in_threadpool(
+            db.save_resume_analyses, user_id, [(filename, source, analysis)]
+        )
+        analysis = dict(analysis, resume_id=resume_id, analysis_id=analysis_id)
+    return JSONResponse(analysis)
+
+
+@_bounded
+async def _match_uploaded(request):
+    db = request.app.state.db
+    request = _capped(request)
+    try:
+        async with request.form(max_files=1, max_fields=MAX_FORM_FIELDS) as form:
+            job_id = _int_param(form.get("job_id"), "job_id")
+            limit = _int_param(form.get("limit"), "limit") or DEFAULT_MATCH_LIMIT
+            filename, source, _ = await _receive_resume(request, form)
+    except UploadTooLarge as e:
+        return _error(str(e), 413)
+    except ValueError as e:
+        return _error(str(e), 400)
+
+    analysis = await _analyze(request, source, filename)
+    if analysis["status"] != "success":
+        return _error(analysis["message"], 422)
+
+    if job_id is not None:
+        job = await run_in_threadpool(db.get_job_posting, job_id)
+        if job is None:
+            return _error("Job posting not found", 404)
+        return JSONResponse({"analysis": analysis, "matches": [dict(match_resume_to_job(analysis, job), job_id=job_id)]})
+
+    # Rank the resume against every job posting
+    jobs = await run_in_threadpool(db.get_all_jobs)
+    job_matches = get_job_matcher(jobs).match(analysis)
+    matches = [dict(job_matches.result(index), job_id=jobs[index]["id"], title=jobs[index]["title"])
+               for index in job_matches.ranked()[:limit]]
+    return JSONResponse({"analysis": analysis, "matches": matches})
+
+
+async def _match_stored(request):
+    db = request.app.state.db
+    try:
+        body = await request.json()
+        resume_id = _int_param(body.get("resume_id"), "resume_id")
+        job_id = _int_param(body.get("job_id"), "job_id")
+    except (ValueError, AttributeError):
+        return _error("Expected a JSON object with integer resume_id and job_id", 400)
+    if resume_id is None or job_id is None:
+        return _error("resume_id and job_id are required", 400)
+
+    resume = await run_in_threadpool(db.get_resume, resume_id)
+    job = await run_in_threadpool(db.get_job_posting, job_id)
+    if job is None:
+        return _error("Job posting not found", 404)
+    if resume is None:
+        return _error("Resume not found", 404)
+    # Job seekers match their own resumes; recruiters any resume against their own postings
+    user = request.state.user
+    if resume["user_id"] != user["id"] and job["user_id"] != user["id"]:
+        return _error("Not allowed to match this resume", 403)
+
+    analysis = await run_in_threadpool(db.get_resume_analysis, resume_id)
+    if analysis is None:
+        return _error("No analysis found for this resume", 404)
+
+    return JSONResponse(dict(match_resume_to_job(analysis, job), resume_id=resume_id, job_id=job_id))
+
+
+@_authenticated
+async def match(request):
+    """Match an uploaded resume (multipart) or a stored one (JSON) against job postings"""
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        if _too_large(request):
+            return _error("Upload is too large", 413)
+        return await _match_uploaded(request)
+    return await _match_stored(request)
+
+
+@_authenticated
+async def candidates(request):
+    """Top candidates for one of the API key's job postings, best match first"""
+    db = request.app.state.db
+    try:
+        job_id = int(request.path_params["job_id"])
+        top_k = _int_param(request.query_params.get("top_k"), "top_k") or DEFAULT_TOP_K
+    except ValueError as e:
+        return _error(str(e), 400)
+
+    job = await run_in_threadpool(db.get_job_posting, job_id)
+    if job is None:
+        return _error("Job posting not found", 404)
+    if job["user_id"] != request.state.user["id"]:
+        return _error("Only the recruiter who posted this job can see its candidates", 403)
+
+    results = await run_in_threadpool(search_candidates, job, top_k, db)
+    return JSONResponse({"job_id": job_id, "candidates": results})
+
+
+async def health(request):
+    return JSONResponse({"status": "ok"})
+
+
+def create_app(db_path=DEFAULT_DB_PATH, workers=None, max_pending=None, max_upload_bytes=MAX_UPLOAD_BYTES,
+               executor=None):
+    """Build the API application
+
+    workers is the size of the parsing process pool (default: CPU count).
+    A custom executor (e.g. a thread pool in tests) may be passed instead.
+    """
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        pool = executor or ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        app.state.db = DatabaseManager(db_path)
+        app.state.executor = pool
+        app.state.max_upload_bytes = max_upload_bytes
+        app.state.slots = asyncio.Semaphore(max_pending or (workers or os.cpu_count() or 1) * PENDING_PER_WORKER)
+        # Score resumes saved through the API against the job postings, as the UI does
+        start_incremental_matching()
+        try:
+            yield
+        finally:
+            if executor is None:
+                pool.shutdown(wait=True, cancel_futures=True)
+            stop_incremental_matching()
+
+    return Starlette(
+        routes=[
+            Route("/analyze", analyze, methods=["POST"]),
+            Route("/match", match, methods=["POST"]),
+            Route("/jobs/{job_id:int}/candidates", candidates, methods=["GET"]),
+            Route("/health", health, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+app = create_app()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage API keys for the HTTP API.")
+    parser.add_argument("--db-path", default=DEFAULT_DB_PATH, help="SQLite database holding the keys")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create-key", help="Create an API key for a user")
+    create.add_argument("username")
+    create.add_argument("--name", default=None, help="Label for the key, e.g. the client using it")
+    revoke = commands.add_parser("revoke-key", help="Revoke an API key")
+    revoke.add_argument("key")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db_path)
+    if args.command == "create-key":
+        user = db.get_user_by_username(args.username)
+        if user is None:
+            print(f"No user named {args.username}")
+            return 1
+        print(db.create_api_key(user["id"], args.name))
+    elif not db.revoke_api_key(args.key):
+        print("Unknown API key")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
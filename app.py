@@ -1,13 +1,13 @@
 import streamlit as st
 import os
 import base64
+import hashlib
 import time
 from datetime import datetime
 import pandas as pd
 import plotly.express as px
 import matplotlib.pyplot as plt
 from PIL import Image
-import requests
 import sys
 
 # Handle potential missing packages
@@ -24,8 +24,17 @@ except ImportError:
     st_lottie = None
 
 # Import custom modules
-from database.db_manager import DatabaseManager
-from utils.resume_parser import analyze_resume, match_resume_to_job
+from database.db_manager import DatabaseManager, register_change_listener
+from utils.resume_parser import extract_text, match_resume_to_job
+from utils.skill_taxonomy import get_taxonomy
+from utils.candidate_search import search_candidates
+from utils.assets import load_css_text, load_lottie
+from utils.incremental_matcher import match_missing_jobs, start_incremental_matching
+from utils.wordcloud_cache import get_cached_wordcloud, get_or_create_wordcloud
+from utils.task_queue import AnalysisQueue
+from utils.uploads import UploadTooLarge, check_upload_size
+from utils.blob_store import store_upload
+from utils.janitor import start_janitor
 
 # Set page configuration
 st.set_page_config(
@@ -40,15 +49,60 @@ st.set_page_config(
     }
 )
 
+# Shared resources, created once per server process rather than on every rerun
+@st.cache_resource
+def get_db():
+    """Database manager (and its connection pool) shared by all sessions"""
+    database = DatabaseManager()
+    # Keep stored resume-job matches current as analyses and jobs are added
+    start_incremental_matching()
+    # Drop memoized query results whenever the underlying data changes
+    register_change_listener(clear_cached_queries)
+    return database
+
+@st.cache_resource
+def get_analysis_queue():
+    """Background resume analysis queue shared by all sessions"""
+    return AnalysisQueue(get_db().db_path)
+
+@st.cache_resource
+def get_skill_taxonomy():
+    """Skill taxonomy and its compiled matcher"""
+    return get_taxonomy()
+
+# Read-mostly queries, memoized across reruns and sessions
+QUERY_CACHE_TTL = 300
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, show_spinner=False)
+def cached_resume_analysis(resume_id):
+    return get_db().get_resume_analysis(resume_id)
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, show_spinner=False)
+def cached_user_resumes(user_id):
+    return get_db().get_user_resumes(user_id)
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, show_spinner=False)
+def cached_recruiter_jobs(user_id):
+    return get_db().get_recruiter_jobs(user_id)
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, show_spinner=False)
+def cached_job_count():
+    return get_db().count_jobs()
+
+def clear_cached_queries(*_):
+    """Invalidate the memoized queries (called by the database on every write)"""
+    for cached_query in (cached_resume_analysis, cached_user_resumes, cached_recruiter_jobs, cached_job_count):
+        cached_query.clear()
+
 # Initialize database
-db = DatabaseManager()
+db = get_db()
 
-# Function to load custom CSS
+# Function to load custom CSS (the file is read once per process)
 def load_css():
-    try:
-        with open('static/css/style.css') as f:
-            st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
-    except FileNotFoundError:
+    css = load_css_text()
+    if css is not None:
+        st.markdown(f'<style>{css}</style>', unsafe_allow_html=True)
+    else:
         st.warning("CSS file not found. Using default styling.")
         # Apply some minimal default styling
         st.markdown("""
@@ -63,17 +117,6 @@ def load_css():
         </style>
         """, unsafe_allow_html=True)
 
-# Function to load Lottie animations
-def load_lottie_url(url: str):
-    try:
-        r = requests.get(url, timeout=5)
-        if r.status_code != 200:
-            return None
-        return r.json()
-    except Exception as e:
-        st.error(f"Error loading animation: {str(e)}")
-        return None
-        
 # Function to load local Lottie files as fallback
 def load_lottie_fallback():
     # Simple JSON for a basic loading animation as fallback
@@ -137,20 +180,18 @@ def display_lottie(animation, height=300, width=300):
 # Function to save uploaded resume
 def save_uploaded_resume(uploaded_file, user_id):
     if uploaded_file is not None:
-        # Create directory if it doesn't exist
-        save_dir = os.path.join("uploads", str(user_id))
-        os.makedirs(save_dir, exist_ok=True)
-        
-        # Save file to directory
-        file_path = os.path.join(save_dir, uploaded_file.name)
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+        # Stream the file into the blob store (identical files are stored once)
+        try:
+            content_hash, file_path = store_upload(uploaded_file, uploaded_file.name)
+        except UploadTooLarge as e:
+            st.error(str(e))
+            return None, None, None
         
         # Save file info to database
-        resume_id = db.save_resume(user_id, uploaded_file.name, file_path)
+        resume_id = db.save_resume(user_id, uploaded_file.name, file_path, content_hash)
         
-        return resume_id, file_path
-    return None, None
+        return resume_id, file_path, content_hash
+    return None, None, None
 
 # Function to create a gauge chart for resume score
 def create_score_gauge(score):
@@ -184,9 +225,6 @@ if 'username' not in st.session_state:
 if 'guest_mode' not in st.session_state:
     st.session_state.guest_mode = False
     
-if 'temp_resume_path' not in st.session_state:
-    st.session_state.temp_resume_path = None
-    
 if 'current_analysis' not in st.session_state:
     st.session_state.current_analysis = None
     
@@ -199,6 +237,99 @@ if 'resume_history' not in st.session_state:
 # Load custom CSS
 load_css()
 
+# Items per page in long lists
+PAGE_SIZE = 20
+
+# Pagination helpers (lists are read one keyset page at a time)
+def current_page_cursor(key):
+    """Return the cursor of the page currently shown for a paginated list"""
+    cursors = st.session_state.setdefault(f"{key}_cursors", [None])
+    return cursors[-1]
+
+def pagination_controls(key, next_cursor):
+    """Show Previous/Next buttons for a paginated list"""
+    cursors = st.session_state.setdefault(f"{key}_cursors", [None])
+    if len(cursors) == 1 and next_cursor is None:
+        return
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button("← Previous", key=f"{key}_prev", disabled=len(cursors) == 1, on_click=cursors.pop)
+    with col2:
+        st.markdown(f"<p style='text-align: center;'>Page {len(cursors)}</p>", unsafe_allow_html=True)
+    with col3:
+        st.button("Next →", key=f"{key}_next", disabled=next_cursor is None,
+                  on_click=cursors.append, args=(next_cursor,))
+
+def toggle_job_matches(job_id):
+    """Open a job posting's candidate matches, or close them if they are already open"""
+    if st.session_state.get('open_matches_job') == job_id:
+        st.session_state['open_matches_job'] = None
+    else:
+        st.session_state['open_matches_job'] = job_id
+
+# Seconds between status checks while an analysis job is pending
+JOB_POLL_INTERVAL = 1
+
+# Background analysis helpers
+def upload_key(uploaded_file):
+    """Identify an uploaded file across reruns, so it is queued only once
+    
+    Two different files with the same name and size get different keys: the
+    upload's file_id is used where Streamlit provides one, else a hash of its
+    contents.
+    """
+    file_id = getattr(uploaded_file, 'file_id', None)
+    if file_id:
+        return file_id
+    return hashlib.sha256(uploaded_file.getbuffer()).hexdigest()
+
+def wait_for_analysis(job_id):
+    """Show the progress of an analysis job; returns the job once it is done
+    
+    While the job is queued or running this shows its stage and partial
+    results, then reruns the script to poll again.
+    """
+    job = get_analysis_queue().get_job(job_id)
+    if job is None:
+        st.error("Analysis job not found.")
+        return None
+    
+    if job['status'] == 'failed':
+        st.error(job['error'])
+        return None
+    if job['status'] == 'done':
+        return job
+    
+    if job['status'] == 'queued':
+        st.info("Your resume is queued for analysis...")
+    else:
+        stage = (job['stage'] or 'start').replace('_', ' ')
+        st.info(f"Analyzing resume... (last step: {stage})")
+    
+    partial = job['partial'] or {}
+    if partial.get('skills'):
+        st.write(f"**Skills found so far:** {', '.join(partial['skills'])}")
+    for field in ('education', 'experience'):
+        if partial.get(field):
+            st.write(f"**{field.title()} entries found so far:** {len(partial[field])}")
+    
+    time.sleep(JOB_POLL_INTERVAL)
+    st.experimental_rerun()
+
+def show_recent_analysis_jobs(user_id):
+    """List a user's latest analysis jobs and their status"""
+    jobs = get_analysis_queue().get_user_jobs(user_id, limit=5)
+    if not jobs:
+        return
+    
+    st.markdown("### Recent Analyses")
+    for job in jobs:
+        status = job['status'].title()
+        if job['status'] == 'failed':
+            status = f"{status}: {job['error']}"
+        st.write(f"**{job['filename'] or os.path.basename(job['file_path'])}** — {status} ({job['created_at']})")
+
 # Authentication functions
 def login_form():
     st.markdown("""
@@ -208,7 +339,7 @@ def login_form():
     """, unsafe_allow_html=True)
     
     # Load animation with fallback
-    login_animation = load_lottie_url("https://assets3.lottiefiles.com/packages/lf20_q7hibrh9.json")
+    login_animation = load_lottie("login")
     if login_animation is None:
         login_animation = load_lottie_fallback()
     
@@ -245,7 +376,7 @@ def signup_form():
     """, unsafe_allow_html=True)
     
     # Load animation with fallback
-    signup_animation = load_lottie_url("https://assets5.lottiefiles.com/packages/lf20_q5pk6p1k.json")
+    signup_animation = load_lottie("signup")
     if signup_animation is None:
         signup_animation = load_lottie_fallback()
     
@@ -283,75 +414,28 @@ def signup_form():
 
 def logout():
     """Function to log out the user"""
-    # Clean up any temporary files
-    if st.session_state.get('temp_resume_path') and os.path.exists(st.session_state.temp_resume_path):
-        try:
-            os.remove(st.session_state.temp_resume_path)
-        except Exception as e:
-            print(f"Error removing temporary file: {e}")
-    
     st.session_state.logged_in = False
     st.session_state.user_id = None
     st.session_state.user_type = None
     st.session_state.username = None
     st.session_state.guest_mode = False
-    st.session_state.temp_resume_path = None
     st.experimental_rerun()
 
 def enable_guest_mode():
     """Enable guest mode for users without accounts"""
-    # Clean up any previous guest session
-    if st.session_state.get('temp_resume_path') and os.path.exists(st.session_state.temp_resume_path):
-        try:
-            os.remove(st.session_state.temp_resume_path)
-        except Exception as e:
-            print(f"Error removing temporary file: {e}")
-    
     st.session_state.guest_mode = True
     st.session_state.user_type = "job_seeker"
     st.experimental_rerun()
     
 def disable_guest_mode():
     """Disable guest mode and return to login/signup"""
-    # Clean up any temporary files
-    if st.session_state.get('temp_resume_path') and os.path.exists(st.session_state.temp_resume_path):
-        try:
-            os.remove(st.session_state.temp_resume_path)
-        except Exception as e:
-            print(f"Error removing temporary file: {e}")
-    
     st.session_state.guest_mode = False
-    st.session_state.temp_resume_path = None
     st.experimental_rerun()
 
 # Main App UI
-def cleanup_temp_files():
-    """Clean up old temporary files to prevent disk space issues"""
-    temp_dir = "temp"
-    if not os.path.exists(temp_dir):
-        return
-        
-    try:
-        # Get all files in the temp directory
-        files = [os.path.join(temp_dir, f) for f in os.listdir(temp_dir)]
-        files = [(f, os.path.getmtime(f)) for f in files if os.path.isfile(f)]
-        
-        # Sort by modification time (oldest first)
-        files.sort(key=lambda x: x[1])
-        
-        # Keep only the 10 most recent files, delete the rest
-        if len(files) > 10:
-            for file_path, _ in files[:-10]:
-                try:
-                    os.remove(file_path)
-                except Exception as e:
-                    print(f"Error removing old temporary file {file_path}: {e}")
-    except Exception as e:
-        print(f"Error during temp file cleanup: {e}")
-
 def main():
-    # Clean up old temporary files
-    cleanup_temp_files()
+    # Clean up scratch files in the background (at most once an hour per process)
+    start_janitor(db_path=get_db().db_path)
     
     # Check if required packages are available
     if option_menu is None or st_lottie is None:
@@ -504,7 +588,7 @@ def resume_upload_page(guest_mode=False):
     """, unsafe_allow_html=True)
     
     # Upload animation with fallback
-    upload_animation = load_lottie_url("https://assets9.lottiefiles.com/packages/lf20_nw19osms.json")
+    upload_animation = load_lottie("upload")
     if upload_animation is None:
         upload_animation = load_lottie_fallback()
     
@@ -533,43 +617,42 @@ def resume_upload_page(guest_mode=False):
         uploaded_file = st.file_uploader("Drag and drop your resume here", type=['pdf', 'docx'])
         
         if uploaded_file is not None:
-            if guest_mode:
-                # For guest users, use a temporary ID and don't save to database
-                resume_id = f"temp_{int(time.time())}"
-                file_extension = uploaded_file.name.split('.')[-1].lower()
-                temp_dir = "temp"
-                
-                # Create temp directory if it doesn't exist
-                os.makedirs(temp_dir, exist_ok=True)
-                
-                file_path = os.path.join(temp_dir, f"{resume_id}.{file_extension}")
-                
-                # Save the file temporarily
-                with open(file_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-                
-                st.session_state.temp_resume_path = file_path
-            else:
-                resume_id, file_path = save_uploaded_resume(uploaded_file, st.session_state.user_id)
+            # Each upload is saved and queued once; reruns just poll its job
+            analysis_jobs = st.session_state.setdefault('analysis_jobs', {})
+            key = upload_key(uploaded_file)
+            
+            if key not in analysis_jobs:
+                if guest_mode:
+                    # For guest users, analyze the upload in memory and don't save it anywhere
+                    try:
+                        check_upload_size(uploaded_file)
+                    except UploadTooLarge as e:
+                        st.error(str(e))
+                        return
+                    analysis_jobs[key] = get_analysis_queue().enqueue_buffer(uploaded_file, uploaded_file.name)
+                else:
+                    resume_id, file_path, content_hash = save_uploaded_resume(uploaded_file, st.session_state.user_id)
+                    if not file_path:
+                        return
+                    analysis_jobs[key] = get_analysis_queue().enqueue(
+                        file_path, uploaded_file.name, user_id=st.session_state.user_id, resume_id=resume_id,
+                        content_hash=content_hash
+                    )
             
-            if resume_id and file_path:
-                st.success(f"Resume '{uploaded_file.name}' uploaded successfully!")
+            st.success(f"Resume '{uploaded_file.name}' uploaded successfully!")
+            
+            job = wait_for_analysis(analysis_jobs[key])
+            if job is not None:
+                st.session_state.current_analysis = job['result']
+                st.session_state.current_resume_id = job['resume_id']
                 
-                with st.spinner("Analyzing resume..."):
-                    # Analyze the resume
-                    analysis_result = analyze_resume(file_path, resume_id)
-                    
-                    if analysis_result["status"] == "success":
-                        st.session_state.current_analysis = analysis_result
-                        st.session_state.current_resume_id = resume_id
-                        
-                        # Display analysis in an expandable section
-                        with st.expander("Show Analysis Results", expanded=True):
-                            display_resume_analysis(analysis_result)
-                    else:
-                        st.error(analysis_result["message"])
+                # Display analysis in an expandable section
+                with st.expander("Show Analysis Results", expanded=True):
+                    display_resume_analysis(job['result'], source=job['file_path'] or uploaded_file)
+        elif not guest_mode:
+            show_recent_analysis_jobs(st.session_state.user_id)
 
-def display_resume_analysis(analysis):
+def display_resume_analysis(analysis, source=None):
     # Header section
     st.markdown("""
     <div class="custom-card">
@@ -578,6 +661,9 @@ def display_resume_analysis(analysis):
     </div>
     """, unsafe_allow_html=True)
     
+    if analysis.get("truncated"):
+        st.info("This resume is long, so only its first pages were analyzed.")
+    
     # Display metrics in a modern layout
     st.markdown("""
     <style>
@@ -641,31 +727,8 @@ def display_resume_analysis(analysis):
         """, unsafe_allow_html=True)
         
         if analysis["skills"]:
-            # Group skills by categories if possible
-            skill_categories = {
-                "Programming": [],
-                "Database": [],
-                "Web": [],
-                "Cloud": [],
-                "Soft Skills": [],
-                "Other": []
-            }
-            
-            # Simple categorization logic - can be enhanced with more sophisticated categorization
-            for skill in analysis["skills"]:
-                skill_lower = skill.lower()
-                if skill_lower in ["python", "java", "javascript", "c++", "c#", "typescript", "ruby", "php", "go"]:
-                    skill_categories["Programming"].append(skill)
-                elif skill_lower in ["sql", "mysql", "postgresql", "mongodb", "oracle", "database"]:
-                    skill_categories["Database"].append(skill)
-                elif skill_lower in ["html", "css", "react", "angular", "vue", "django", "flask", "node"]:
-                    skill_categories["Web"].append(skill)
-                elif skill_lower in ["aws", "azure", "gcp", "docker", "kubernetes", "cloud"]:
-                    skill_categories["Cloud"].append(skill)
-                elif skill_lower in ["leadership", "communication", "teamwork", "problem solving", "management"]:
-                    skill_categories["Soft Skills"].append(skill)
-                else:
-                    skill_categories["Other"].append(skill)
+            # Group skills by their taxonomy category
+            skill_categories = get_skill_taxonomy().group_by_category(analysis["skills"])
             
             # Display skills by category
             for category, skills in skill_categories.items():
@@ -730,18 +793,25 @@ def display_resume_analysis(analysis):
             st.info("No specific suggestions available for this resume.")
         st.markdown("</div>", unsafe_allow_html=True)
     
-    # Display word cloud
-    if "wordcloud_path" in analysis and analysis["wordcloud_path"]:
-        st.markdown("""
-        <div class="custom-card">
-            <h3 style="color: #0071e3; margin-bottom: 15px;">Resume Word Cloud</h3>
-            <div style="text-align: center;">
-        """, unsafe_allow_html=True)
-        st.image(analysis["wordcloud_path"])
-        st.markdown("""
+    # Display word cloud (rendered only on request, cached by file content)
+    content_hash = analysis.get("content_hash")
+    if content_hash and source is not None:
+        wordcloud_path = get_cached_wordcloud(content_hash)
+        if wordcloud_path is None and st.button("Generate Word Cloud", key=f"wordcloud_{content_hash}"):
+            with st.spinner("Generating word cloud..."):
+                wordcloud_path = get_or_create_wordcloud(content_hash, lambda: extract_text(source))
+        
+        if wordcloud_path:
+            st.markdown("""
+            <div class="custom-card">
+                <h3 style="color: #0071e3; margin-bottom: 15px;">Resume Word Cloud</h3>
+                <div style="text-align: center;">
+            """, unsafe_allow_html=True)
+            st.image(wordcloud_path)
+            st.markdown("""
+                </div>
             </div>
-        </div>
-        """, unsafe_allow_html=True)
+            """, unsafe_allow_html=True)
 
 def my_resumes_page():
     st.markdown("""
@@ -751,7 +821,9 @@ def my_resumes_page():
     </div>
     """, unsafe_allow_html=True)
     
-    resumes = db.get_user_resumes(st.session_state.user_id)
+    page_key = f"my_resumes_{st.session_state.user_id}"
+    resumes, next_cursor = db.get_user_resumes_page(st.session_state.user_id, PAGE_SIZE,
+                                                    before=current_page_cursor(page_key))
     
     if not resumes:
         st.markdown("""
@@ -764,7 +836,7 @@ def my_resumes_page():
         """, unsafe_allow_html=True)
         
         # No resumes animation with fallback
-        empty_animation = load_lottie_url("https://assets5.lottiefiles.com/packages/lf20_ydo1amjm.json")
+        empty_animation = load_lottie("empty")
         if empty_animation is None:
             empty_animation = load_lottie_fallback()
         display_lottie(empty_animation, height=200)
@@ -777,7 +849,7 @@ def my_resumes_page():
                 {} Resumes
             </span>
         </div>
-        """.format(len(resumes)), unsafe_allow_html=True)
+        """.format(db.count_user_resumes(st.session_state.user_id)), unsafe_allow_html=True)
         
         # Display resumes in cards with modern styling
         st.markdown("""
@@ -834,7 +906,7 @@ def my_resumes_page():
         
         # Create cards for each resume
         for resume in resumes:
-            score = db.get_resume_score(resume['id'])
+            score = resume['score']
             
             st.markdown(f"""
             <div class="resume-card" id="resume-{resume['id']}">
@@ -869,23 +941,17 @@ def my_resumes_page():
             # Hidden buttons that will be clicked by the JavaScript in the HTML
             if st.button("View", key=f"view-btn-{resume['id']}", help="View resume analysis", style="visibility: hidden;"):
                 # Get analysis results
-                analysis = db.get_resume_analysis(resume['id'])
+                analysis = cached_resume_analysis(resume['id'])
                 
                 if analysis:
-                    # Convert string data back to lists
-                    skills = analysis['skills'].split(", ") if analysis['skills'] else []
-                    education = analysis['education'].split(", ") if analysis['education'] else []
-                    experience = analysis['experience'].split(", ") if analysis['experience'] else []
-                    suggestions = analysis['feedback'].split(", ") if analysis['feedback'] else []
-                    
                     # Create analysis dict
                     analysis_result = {
                         "status": "success",
-                        "skills": skills,
-                        "education": education,
-                        "experience": experience,
+                        "skills": analysis['skills'],
+                        "education": analysis['education'],
+                        "experience": analysis['experience'],
                         "score": analysis['score'],
-                        "suggestions": suggestions,
+                        "suggestions": analysis['feedback'],
                         "text_length": 0  # Not stored in DB
                     }
                     
@@ -897,6 +963,8 @@ def my_resumes_page():
             if st.button("Delete", key=f"delete-btn-{resume['id']}", help="Delete this resume", style="visibility: hidden;"):
                 # Implement delete functionality
                 st.error("Delete functionality not yet implemented")
+        
+        pagination_controls(page_key, next_cursor)
 
 def job_matching_page():
     st.markdown("""
@@ -907,7 +975,7 @@ def job_matching_page():
     """, unsafe_allow_html=True)
     
     # Get user's resumes
-    resumes = db.get_user_resumes(st.session_state.user_id)
+    resumes = cached_user_resumes(st.session_state.user_id)
     
     if not resumes:
         st.markdown("""
@@ -923,10 +991,9 @@ def job_matching_page():
                                      format_func=lambda x: resume_options[x])
     
     if selected_resume_id:
-        # Get available jobs
-        jobs = db.get_all_jobs()
+        job_count = cached_job_count()
         
-        if not jobs:
+        if job_count == 0:
             st.markdown("""
             <div class="warning-box">
                 <p>There are no job postings available yet. Please check back later.</p>
@@ -935,35 +1002,30 @@ def job_matching_page():
             return
         
         # Get selected resume analysis
-        resume_analysis = db.get_resume_analysis(selected_resume_id)
+        resume_analysis = cached_resume_analysis(selected_resume_id)
         
         if not resume_analysis:
             st.warning("No analysis found for this resume. Please re-upload it.")
             return
         
-        # Convert analysis data for matching
-        analysis_data = {
-            "skills": resume_analysis['skills'].split(", ") if resume_analysis['skills'] else [],
-            "education": resume_analysis['education'].split(", ") if resume_analysis['education'] else [],
-            "experience": resume_analysis['experience'].split(", ") if resume_analysis['experience'] else [],
-        }
-        
-        # Match with jobs
+        # Matches are precomputed in the background; read them best first
         st.markdown("### Job Matches")
         
-        for job in jobs:
-            # Match resume to job
-            match_result = match_resume_to_job(analysis_data, job)
-            
-            # Save match to database
-            db.save_resume_job_match(selected_resume_id, job['id'], 
-                                   match_result['match_score'],
-                                   match_result['match_details'])
-            
+        if db.count_resume_job_matches(selected_resume_id, resume_analysis['id']) < job_count:
+            # The background matcher hasn't caught up with this resume yet
+            match_missing_jobs(resume_analysis, db)
+        
+        page_key = f"job_matches_{selected_resume_id}_{resume_analysis['id']}"
+        matches, next_cursor = db.get_resume_job_matches_page(
+            resume_id=selected_resume_id, analysis_id=resume_analysis['id'],
+            limit=PAGE_SIZE, before=current_page_cursor(page_key)
+        )
+        
+        for match in matches:
             # Determine match color class
-            if match_result['match_score'] >= 75:
+            if match['match_score'] >= 75:
                 match_class = "match-high"
-            elif match_result['match_score'] >= 50:
+            elif match['match_score'] >= 50:
                 match_class = "match-medium"
             else:
                 match_class = "match-low"
@@ -971,17 +1033,19 @@ def job_matching_page():
             # Display job card with match score
             st.markdown(f"""
             <div class="custom-card job-card">
-                <h3>{job['title']}</h3>
-                <p>{job['description'][:150]}...</p>
-                <p><strong>Skills Required:</strong> {job['required_skills']}</p>
-                <p><strong>Match Score:</strong> <span class="{match_class}">{match_result['match_score']}%</span></p>
+                <h3>{match['title']}</h3>
+                <p>{match['description'][:150]}...</p>
+                <p><strong>Skills Required:</strong> {match['required_skills']}</p>
+                <p><strong>Match Score:</strong> <span class="{match_class}">{match['match_score']}%</span></p>
             </div>
             """, unsafe_allow_html=True)
             
             # Show match details in expander
             with st.expander("Match Details"):
-                for detail in match_result['match_details']:
+                for detail in match['match_details'].split("\n"):
                     st.write(detail)
+        
+        pagination_controls(page_key, next_cursor)
 
 def post_job_page():
     st.markdown("""
@@ -1016,7 +1080,7 @@ def post_job_page():
                 if job_id:
                     st.success("Job posted successfully!")
                     # Show success animation with fallback
-                    success_animation = load_lottie_url("https://assets6.lottiefiles.com/packages/lf20_swnc1xqy.json")
+                    success_animation = load_lottie("success")
                     if success_animation is None:
                         success_animation = load_lottie_fallback()
                     display_lottie(success_animation, height=150)
@@ -1033,8 +1097,10 @@ def my_postings_page():
     </div>
     """, unsafe_allow_html=True)
     
-    # Get recruiter's job postings
-    jobs = db.get_recruiter_jobs(st.session_state.user_id)
+    # Get one page of the recruiter's job postings
+    page_key = f"my_postings_{st.session_state.user_id}"
+    jobs, next_cursor = db.get_recruiter_jobs_page(st.session_state.user_id, PAGE_SIZE,
+                                                   before=current_page_cursor(page_key))
     
     if not jobs:
         st.markdown("""
@@ -1044,7 +1110,7 @@ def my_postings_page():
         """, unsafe_allow_html=True)
         
         # No jobs animation with fallback
-        empty_animation = load_lottie_url("https://assets5.lottiefiles.com/packages/lf20_ydo1amjm.json")
+        empty_animation = load_lottie("empty")
         if empty_animation is None:
             empty_animation = load_lottie_fallback()
         display_lottie(empty_animation)
@@ -1067,15 +1133,19 @@ def my_postings_page():
             """, unsafe_allow_html=True)
             
             # View matches for this job posting
-            if st.button(f"View Matches", key=f"matches_{job['id']}"):
-                matches = db.get_resume_job_matches(job_id=job['id'])
+            st.button("Hide Matches" if st.session_state.get('open_matches_job') == job['id'] else "View Matches",
+                      key=f"matches_{job['id']}", on_click=toggle_job_matches, args=(job['id'],))
+            
+            if st.session_state.get('open_matches_job') == job['id']:
+                matches_key = f"candidate_matches_{job['id']}"
+                matches, matches_cursor = db.get_resume_job_matches_page(
+                    job_id=job['id'], limit=PAGE_SIZE, before=current_page_cursor(matches_key)
+                )
                 
                 if matches:
                     st.markdown("### Candidate Matches")
                     
-                    # Sort matches by score (highest first)
-                    matches.sort(key=lambda x: x['match_score'], reverse=True)
-                    
+                    # Matches come back sorted by score (highest first)
                     for match in matches:
                         # Determine match color class
                         if match['match_score'] >= 75:
@@ -1096,8 +1166,12 @@ def my_postings_page():
                         # Show match details in expander
                         with st.expander("Match Details"):
                             st.write(match['match_details'])
+                    
+                    pagination_controls(matches_key, matches_cursor)
                 else:
                     st.info("No candidate matches found for this job posting yet.")
+        
+        pagination_controls(page_key, next_cursor)
 
 def resume_matching_page():
     st.markdown("""
@@ -1108,7 +1182,7 @@ def resume_matching_page():
     """, unsafe_allow_html=True)
     
     # Get recruiter's job postings
-    jobs = db.get_recruiter_jobs(st.session_state.user_id)
+    jobs = cached_recruiter_jobs(st.session_state.user_id)
     
     if not jobs:
         st.markdown("""
@@ -1135,55 +1209,90 @@ def resume_matching_page():
             st.error("Job not found")
             return
         
-        # Allow resume upload for matching
-        st.markdown("### Upload Resume to Match")
-        uploaded_file = st.file_uploader("Upload Resume (PDF or DOCX)", type=['pdf', 'docx'])
+        # Search every stored resume for the best candidates
+        st.markdown("### Search Candidates")
+        top_k = st.number_input("Number of candidates", min_value=1, max_value=100, value=10,
+                                key=f"top_k_{selected_job_id}")
         
-        if uploaded_file is not None:
-            # Temporarily save the file
-            temp_dir = os.path.join("uploads", "temp")
-            os.makedirs(temp_dir, exist_ok=True)
-            file_path = os.path.join(temp_dir, uploaded_file.name)
-            
-            with open(file_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
+        if st.button("Find Top Candidates", key=f"search_{selected_job_id}"):
+            with st.spinner("Searching candidates..."):
+                candidates = search_candidates(selected_job, top_k=int(top_k), db=db)
             
-            with st.spinner("Analyzing resume..."):
-                # Analyze the resume (without saving to DB)
-                analysis_result = analyze_resume(file_path)
-                
-                if analysis_result["status"] == "success":
-                    # Match with selected job
-                    match_result = match_resume_to_job(analysis_result, selected_job)
-                    
+            if candidates:
+                for candidate in candidates:
                     # Determine match color class
-                    if match_result['match_score'] >= 75:
+                    if candidate['match_score'] >= 75:
                         match_class = "match-high"
-                    elif match_result['match_score'] >= 50:
+                    elif candidate['match_score'] >= 50:
                         match_class = "match-medium"
                     else:
                         match_class = "match-low"
                     
-                    # Display match result
                     st.markdown(f"""
                     <div class="custom-card">
-                        <h3>Match Result</h3>
-                        <p><strong>Resume:</strong> {uploaded_file.name}</p>
-                        <p><strong>Job:</strong> {selected_job['title']}</p>
-                        <p><strong>Match Score:</strong> <span class="{match_class}">{match_result['match_score']}%</span></p>
+                        <h4>{candidate['filename']}</h4>
+                        <p><strong>Match Score:</strong> <span class="{match_class}">{candidate['match_score']:.1f}%</span></p>
+                        <p><strong>Skills:</strong> {', '.join(candidate['skills'])}</p>
                     </div>
                     """, unsafe_allow_html=True)
                     
-                    # Show match details
-                    st.markdown("### Match Details")
-                    for detail in match_result['match_details']:
-                        st.write(detail)
-                    
-                    # Show resume analysis
-                    with st.expander("View Resume Analysis"):
-                        display_resume_analysis(analysis_result)
+                    with st.expander("Match Details"):
+                        for detail in candidate['match_details']:
+                            st.write(detail)
+            else:
+                st.info("No analyzed resumes found yet.")
+        
+        # Allow resume upload for matching
+        st.markdown("### Upload Resume to Match")
+        uploaded_file = st.file_uploader("Upload Resume (PDF or DOCX)", type=['pdf', 'docx'])
+        
+        if uploaded_file is not None:
+            analysis_jobs = st.session_state.setdefault('analysis_jobs', {})
+            key = upload_key(uploaded_file)
+            
+            if key not in analysis_jobs:
+                try:
+                    check_upload_size(uploaded_file)
+                except UploadTooLarge as e:
+                    st.error(str(e))
+                    return
+                
+                # Analyze the resume in the background, straight from memory (without saving it)
+                analysis_jobs[key] = get_analysis_queue().enqueue_buffer(uploaded_file, uploaded_file.name)
+            
+            job = wait_for_analysis(analysis_jobs[key])
+            if job is not None:
+                analysis_result = job['result']
+                
+                # Match with selected job
+                match_result = match_resume_to_job(analysis_result, selected_job)
+                
+                # Determine match color class
+                if match_result['match_score'] >= 75:
+                    match_class = "match-high"
+                elif match_result['match_score'] >= 50:
+                    match_class = "match-medium"
                 else:
-                    st.error(analysis_result["message"])
+                    match_class = "match-low"
+                
+                # Display match result
+                st.markdown(f"""
+                <div class="custom-card">
+                    <h3>Match Result</h3>
+                    <p><strong>Resume:</strong> {uploaded_file.name}</p>
+                    <p><strong>Job:</strong> {selected_job['title']}</p>
+                    <p><strong>Match Score:</strong> <span class="{match_class}">{match_result['match_score']}%</span></p>
+                </div>
+                """, unsafe_allow_html=True)
+                
+                # Show match details
+                st.markdown("### Match Details")
+                for detail in match_result['match_details']:
+                    st.write(detail)
+                
+                # Show resume analysis
+                with st.expander("View Resume Analysis"):
+                    display_resume_analysis(analysis_result, source=uploaded_file)
 
 def about_page():
     st.markdown("""
@@ -1193,7 +1302,7 @@ def about_page():
     """, unsafe_allow_html=True)
     
     # About animation with fallback
-    about_animation = load_lottie_url("https://assets1.lottiefiles.com/packages/lf20_v4isjbj5.json")
+    about_animation = load_lottie("about")
     if about_animation is None:
         about_animation = load_lottie_fallback()
     display_lottie(about_animation, height=300)
@@ -0,0 +1,101 @@
+"""
+Shared SQLite connection pool.
+
+Connections are opened once per database file and reused across calls and
+threads. Each one is configured for concurrent use: WAL journaling,
+synchronous=NORMAL, a larger page cache and a busy timeout, so readers no
+longer block the writer and short write bursts wait instead of failing.
+"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Defined next to the schema so "python database/db_setup.py" can run without the package
+from database.db_setup import DEFAULT_DB_PATH
+
+# Idle connections kept per database file
+POOL_SIZE = 8
+
+# How long a writer waits for the database lock before raising "database is locked"
+BUSY_TIMEOUT_MS = 5000
+
+# Page cache per connection, in KiB (SQLite takes negative values as KiB)
+CACHE_SIZE_KIB = 16 * 1024
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _open_connection(db_path):
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+class ConnectionPool:
+    """A bounded pool of configured connections to one SQLite file"""
+
+    def __init__(self, db_path, size=POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _acquire(self):
+        if self._pid != os.getpid():
+            # Connections must not be shared with a forked child; start afresh
+            self._pid = os.getpid()
+            self._idle = queue.LifoQueue(maxsize=self.size)
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return _open_connection(self.db_path)
+
+    def _release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commit on success, roll back on error"""
+        conn = self._acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def get_pool(db_path=DEFAULT_DB_PATH):
+    """Return the process-wide pool for a database file"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
+
+
+def connection(db_path=DEFAULT_DB_PATH):
+    """Shortcut for get_pool(db_path).connection()"""
+    return get_pool(db_path).connection()
@@ -1,55 +1,99 @@
 import sqlite3
 import os
+import json
+import hashlib
+import secrets
+import threading
 from datetime import datetime
 
+from database.connection import DEFAULT_DB_PATH, get_pool
+from database.db_setup import ANALYSIS_LIST_FIELDS, initialize_database, link_analysis_skills
+
+# Database files whose schema has been created/migrated by this process
+_initialized_paths = set()
+_initialized_lock = threading.Lock()
+
+# Change events passed to listeners, with the IDs of the new rows
+RESUME_SAVED = "resume_saved"
+ANALYSIS_SAVED = "analysis_saved"
+JOB_POSTED = "job_posted"
+# Passed the (resume_id, job_id) pairs of the saved matches
+MATCHES_SAVED = "matches_saved"
+
+_change_listeners = []
+_change_listeners_lock = threading.Lock()
+
+def register_change_listener(listener):
+    """Call listener(event, db_path, record_ids) after resumes, analyses or matches are saved or jobs are posted"""
+    with _change_listeners_lock:
+        if listener not in _change_listeners:
+            _change_listeners.append(listener)
+
+def unregister_change_listener(listener):
+    with _change_listeners_lock:
+        if listener in _change_listeners:
+            _change_listeners.remove(listener)
+
+def _split_page(items, limit, cursor_columns):
+    """Trim a limit + 1 row result to one page and derive the cursor of the next page"""
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, tuple(items[-1][column] for column in cursor_columns)
+
 class DatabaseManager:
-    def __init__(self, db_path='database/resume_analyzer.db'):
+    def __init__(self, db_path=DEFAULT_DB_PATH):
         """Initialize database connection"""
         self.db_path = db_path
         # Ensure database directory exists
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
         
-        # Initialize database if it doesn't exist
-        if not os.path.exists(db_path):
-            from database.db_setup import create_database
-            create_database()
+        self._pool = get_pool(db_path)
     
-    def _connect(self):
-        """Create a connection to the database"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-        return conn
+        # Create missing tables and upgrade existing databases in place
+        key = os.path.abspath(db_path)
+        if key not in _initialized_paths:
+            with _initialized_lock:
+                if key not in _initialized_paths:
+                    with self._connection() as conn:
+                        initialize_database(conn)
+                    _initialized_paths.add(key)
+
+    def _connection(self):
+        """Borrow a pooled connection; commits on success and rolls back on error"""
+        return self._pool.connection()
+
+    def _notify(self, event, record_ids):
+        """Tell the registered listeners about committed changes"""
+        with _change_listeners_lock:
+            listeners = list(_change_listeners)
+        for listener in listeners:
+            try:
+                listener(event, self.db_path, record_ids)
+            except Exception as e:
+                print(f"Error in change listener {listener!r}: {e}")
     
     # User Management
     def create_user(self, username, password, user_type):
         """Create a new user"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(
-                "INSERT INTO users (username, password, user_type) VALUES (?, ?, ?)",
-                (username, password, user_type)
-            )
-            conn.commit()
-            user_id = cursor.lastrowid
+            with self._connection() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO users (username, password, user_type) VALUES (?, ?, ?)",
+                    (username, password, user_type)
+                )
+                user_id = cursor.lastrowid
             return {"status": "success", "user_id": user_id}
         except sqlite3.IntegrityError:
             return {"status": "error", "message": "Username already exists"}
-        finally:
-            conn.close()
     
     def authenticate_user(self, username, password):
         """Authenticate a user"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT id, username, user_type FROM users WHERE username = ? AND password = ?",
-            (username, password)
-        )
-        user = cursor.fetchone()
-        conn.close()
+        with self._connection() as conn:
+            user = conn.execute(
+                "SELECT id, username, user_type FROM users WHERE username = ? AND password = ?",
+                (username, password)
+            ).fetchone()
         
         if user:
             return {
@@ -63,96 +107,412 @@ class DatabaseManager:
     
     def get_user_by_id(self, user_id):
         """Get user info by ID"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, username, user_type FROM users WHERE id = ?", (user_id,))
-        user = cursor.fetchone()
-        conn.close()
+        with self._connection() as conn:
+            user = conn.execute("SELECT id, username, user_type FROM users WHERE id = ?", (user_id,)).fetchone()
         
         if user:
             return dict(user)
         else:
             return None
     
+    def get_user_by_username(self, username):
+        """Get user info by username"""
+        with self._connection() as conn:
+            user = conn.execute("SELECT id, username, user_type FROM users WHERE username = ?", (username,)).fetchone()
+
+        if user:
+            return dict(user)
+        else:
+            return None
+
+    # API Keys
+    @staticmethod
+    def _hash_api_key(key):
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def create_api_key(self, user_id, name=None):
+        """Create an API key for a user and return it (only its hash is stored)"""
+        key = secrets.token_urlsafe(32)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO api_keys (user_id, key_hash, name) VALUES (?, ?, ?)",
+                (user_id, self._hash_api_key(key), name)
+            )
+
+        return key
+
+    def get_api_key_user(self, key):
+        """Get the user an API key belongs to, or None if the key is unknown"""
+        with self._connection() as conn:
+            user = conn.execute(
+                """SELECT u.id, u.username, u.user_type
+                FROM api_keys k JOIN users u ON u.id = k.user_id
+                WHERE k.key_hash = ?""",
+                (self._hash_api_key(key),)
+            ).fetchone()
+
+        if user:
+            return dict(user)
+        else:
+            return None
+
+    def revoke_api_key(self, key):
+        """Delete an API key; returns True if it existed"""
+        with self._connection() as conn:
+            cursor = conn.execute("DELETE FROM api_keys WHERE key_hash = ?", (self._hash_api_key(key),))
+            deleted = cursor.rowcount > 0
+
+        return deleted
+
     # Resume Management
-    def save_resume(self, user_id, filename, file_path):
-        """Save uploaded resume information"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "INSERT INTO resumes (user_id, filename, file_path) VALUES (?, ?, ?)",
-            (user_id, filename, file_path)
-        )
-        conn.commit()
-        resume_id = cursor.lastrowid
-        conn.close()
+    def save_resume(self, user_id, filename, file_path, content_hash=None):
+        """Save uploaded resume information
+        
+        content_hash (the file's SHA-256) counts as a reference to the
+        upload blob with that hash.
+        """
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO resumes (user_id, filename, file_path, content_hash) VALUES (?, ?, ?, ?)",
+                (user_id, filename, file_path, content_hash)
+            )
+            resume_id = cursor.lastrowid
         
+        self._notify(RESUME_SAVED, [resume_id])
         return resume_id
     
     def get_resume(self, resume_id):
         """Get resume information"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM resumes WHERE id = ?", (resume_id,))
-        resume = cursor.fetchone()
-        conn.close()
+        with self._connection() as conn:
+            resume = conn.execute("SELECT * FROM resumes WHERE id = ?", (resume_id,)).fetchone()
         
         if resume:
             return dict(resume)
         else:
             return None
     
+    def get_referenced_content_hashes(self, content_hashes):
+        """Return the subset of content_hashes that at least one resume refers to"""
+        referenced = set()
+        content_hashes = list(content_hashes)
+        with self._connection() as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(content_hashes), 500):
+                chunk = content_hashes[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor = conn.execute(
+                    f"SELECT DISTINCT content_hash FROM resumes WHERE content_hash IN ({placeholders})",
+                    chunk
+                )
+                referenced.update(row[0] for row in cursor.fetchall())
+
+        return referenced
+
+    def get_resume_files(self, after_id=0, limit=500):
+        """Return the id, file_path and content_hash of resumes with IDs above after_id, in ID order"""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "SELECT id, file_path, content_hash FROM resumes WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, limit)
+            )
+            resumes = [dict(row) for row in cursor.fetchall()]
+
+        return resumes
+
+    def update_resume_files(self, updates):
+        """Point resumes at new files; updates is an iterable of (resume_id, file_path, content_hash)"""
+        rows = [(file_path, content_hash, resume_id) for resume_id, file_path, content_hash in updates]
+        if not rows:
+            return
+
+        with self._connection() as conn:
+            conn.executemany("UPDATE resumes SET file_path = ?, content_hash = ? WHERE id = ?", rows)
+
+    def get_referenced_file_paths(self, file_paths):
+        """Return the subset of file_paths that at least one resume still points at"""
+        referenced = set()
+        file_paths = list(file_paths)
+        with self._connection() as conn:
+            for start in range(0, len(file_paths), 500):
+                chunk = file_paths[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor = conn.execute(
+                    f"SELECT DISTINCT file_path FROM resumes WHERE file_path IN ({placeholders})",
+                    chunk
+                )
+                referenced.update(row[0] for row in cursor.fetchall())
+
+        return referenced
+
     def get_user_resumes(self, user_id):
         """Get all resumes for a user"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM resumes WHERE user_id = ? ORDER BY uploaded_at DESC", (user_id,))
-        resumes = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.execute("SELECT * FROM resumes WHERE user_id = ? ORDER BY uploaded_at DESC", (user_id,))
+            resumes = [dict(row) for row in cursor.fetchall()]
         
         return resumes
+
+    def get_user_resumes_with_scores(self, user_id, limit=None, offset=0, include_analysis=False, before=None):
+        """Get a user's resumes with their latest analysis score in one query, newest first
+
+        Every resume gets a 'score' (0 if it was never analyzed). With
+        include_analysis it also gets an 'analysis' dict as returned by
+        get_resume_analysis, or None. before is an (uploaded_at, id) cursor:
+        only resumes after it in the listing order are returned.
+        """
+        analysis_columns = ("skills", "education", "experience", "feedback", "skills_json",
+                            "education_json", "experience_json", "feedback_json", "analyzed_at")
+        extra_columns = "".join(f", a.{column}" for column in analysis_columns) if include_analysis else ""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                f"""SELECT r.*, COALESCE(a.score, 0) AS score, a.id AS analysis_id{extra_columns}
+                FROM resumes r
+                LEFT JOIN analysis_results a ON a.id = (
+                    SELECT latest.id FROM analysis_results latest
+                    WHERE latest.resume_id = r.id
+                    ORDER BY latest.analyzed_at DESC, latest.id DESC
+                    LIMIT 1
+                )
+                WHERE r.user_id = ? {"AND (r.uploaded_at, r.id) < (?, ?)" if before else ""}
+                ORDER BY r.uploaded_at DESC, r.id DESC
+                LIMIT ? OFFSET ?""",
+                (user_id, *(before or ()), -1 if limit is None else limit, offset)
+            )
+            rows = cursor.fetchall()
+
+        resumes = []
+        for row in rows:
+            resume = {key: row[key] for key in row.keys() if key not in analysis_columns}
+            if include_analysis:
+                resume["analysis"] = None
+                if resume["analysis_id"] is not None:
+                    analysis = {key: row[key] for key in analysis_columns}
+                    analysis.update(id=resume["analysis_id"], resume_id=resume["id"], score=resume["score"])
+                    resume["analysis"] = self._decode_analysis(analysis)
+            resumes.append(resume)
+
+        return resumes
+
+    def get_user_resumes_page(self, user_id, limit=20, before=None, include_analysis=False):
+        """Get one page of get_user_resumes_with_scores; returns (resumes, next_cursor)
+
+        Pass next_cursor back as before to get the following page; it is
+        None on the last page.
+        """
+        resumes = self.get_user_resumes_with_scores(user_id, limit=limit + 1, include_analysis=include_analysis,
+                                                    before=before)
+        return _split_page(resumes, limit, ("uploaded_at", "id"))
+
+    def count_user_resumes(self, user_id):
+        """Get the number of resumes a user has uploaded"""
+        with self._connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM resumes WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+        return count
     
+    def save_resume_analyses(self, user_id, items):
+        """Save resumes and their analyses in a single transaction (bulk import)
+
+        items is a list of (filename, file_path, analysis) tuples.
+        Returns a list of (resume_id, analysis_id) tuples in the same order.
+        """
+        saved = []
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            for filename, file_path, analysis in items:
+                cursor.execute(
+                    "INSERT INTO resumes (user_id, filename, file_path, content_hash) VALUES (?, ?, ?, ?)",
+                    (user_id, filename, file_path, analysis.get("content_hash"))
+                )
+                resume_id = cursor.lastrowid
+                saved.append((resume_id, self._insert_analysis(
+                    cursor, resume_id, analysis["skills"], analysis["education"],
+                    analysis["experience"], analysis["score"], analysis["suggestions"]
+                )))
+
+        self._notify(RESUME_SAVED, [resume_id for resume_id, _ in saved])
+        self._notify(ANALYSIS_SAVED, [analysis_id for _, analysis_id in saved])
+        return saved
+
     # Analysis Management
+    @staticmethod
+    def _insert_analysis(cursor, resume_id, skills, education, experience, score, feedback):
+        """Insert one analysis_results row using an open cursor"""
+        # Lists are stored as JSON so entries containing commas survive intact
+        cursor.execute(
+            """INSERT INTO analysis_results
+            (resume_id, skills_json, education_json, experience_json, score, feedback_json)
+            VALUES (?, ?, ?, ?, ?, ?)""",
+            (resume_id, json.dumps(list(skills)), json.dumps(list(education)),
+             json.dumps(list(experience)), score, json.dumps(list(feedback)))
+        )
+        analysis_id = cursor.lastrowid
+        link_analysis_skills(cursor.connection, analysis_id, skills)
+
+        # Only a resume's latest analysis stays in the skill posting lists
+        cursor.execute(
+            """DELETE FROM skill_postings WHERE analysis_id IN (
+                SELECT id FROM analysis_results WHERE resume_id = ? AND id < ?
+            )""",
+            (resume_id, analysis_id)
+        )
+        cursor.execute(
+            """INSERT OR IGNORE INTO skill_postings (skill_id, analysis_id)
+            SELECT skill_id, analysis_id FROM analysis_skills WHERE analysis_id = ?""",
+            (analysis_id,)
+        )
+        return analysis_id
+
+    @staticmethod
+    def _decode_analysis(row):
+        """Turn an analysis_results row into a dict with list-valued fields"""
+        analysis = dict(row)
+        for field in ANALYSIS_LIST_FIELDS:
+            encoded = analysis.pop(f"{field}_json", None)
+            if encoded is not None:
+                analysis[field] = json.loads(encoded)
+            else:
+                # Rows written before the JSON columns existed
+                legacy = analysis.get(field)
+                analysis[field] = legacy.split(", ") if legacy else []
+        return analysis
+
+    def save_analysis(self, resume_id, skills, education, experience, score, feedback):
+        """Save analysis results for a resume"""
+        with self._connection() as conn:
+            analysis_id = self._insert_analysis(conn.cursor(), resume_id, skills, education,
+                                                experience, score, feedback)
+
+        self._notify(ANALYSIS_SAVED, [analysis_id])
+        return analysis_id
+
     def get_analysis(self, analysis_id):
         """Get resume analysis result"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM analysis_results WHERE id = ?", (analysis_id,))
-        analysis = cursor.fetchone()
-        conn.close()
+        with self._connection() as conn:
+            analysis = conn.execute("SELECT * FROM analysis_results WHERE id = ?", (analysis_id,)).fetchone()
         
         if analysis:
-            return dict(analysis)
+            return self._decode_analysis(analysis)
         else:
             return None
     
     def get_resume_analysis(self, resume_id):
         """Get analysis for a specific resume"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM analysis_results WHERE resume_id = ? ORDER BY analyzed_at DESC", (resume_id,))
-        analysis = cursor.fetchone()
-        conn.close()
+        with self._connection() as conn:
+            analysis = conn.execute(
+                "SELECT * FROM analysis_results WHERE resume_id = ? ORDER BY analyzed_at DESC, id DESC",
+                (resume_id,)
+            ).fetchone()
         
         if analysis:
-            return dict(analysis)
+            return self._decode_analysis(analysis)
         else:
             return None
             
+    def find_analyses_with_skills(self, skills, match_all=True, limit=100):
+        """Find the latest analyses that list all (or, with match_all=False, any) of the given skills
+
+        Reads the skill posting lists, which hold only each resume's latest
+        analysis, so the cost depends on how many analyses mention the skills
+        rather than on the total number stored. Returns dicts with
+        analysis_id, resume_id, score, filename and user_id, best scores first.
+        """
+        names = list(dict.fromkeys(skill.strip().lower() for skill in skills if skill and skill.strip()))
+        if not names:
+            return []
+
+        placeholders = ", ".join("?" * len(names))
+        with self._connection() as conn:
+            cursor = conn.execute(
+                f"""SELECT a.id AS analysis_id, a.resume_id, a.score, a.analyzed_at, r.filename, r.user_id
+                FROM skills s
+                JOIN skill_postings p ON p.skill_id = s.id
+                JOIN analysis_results a ON a.id = p.analysis_id
+                JOIN resumes r ON r.id = a.resume_id
+                WHERE s.name IN ({placeholders})
+                GROUP BY a.id
+                HAVING COUNT(*) >= ?
+                ORDER BY a.score DESC, a.id DESC
+                LIMIT ?""",
+                (*names, len(names) if match_all else 1, limit)
+            )
+            analyses = [dict(row) for row in cursor.fetchall()]
+
+        return analyses
+
+    def count_skill_matches(self, skills):
+        """Return {analysis_id: number of the given skills it lists} for every latest analysis listing any"""
+        names = list(dict.fromkeys(skill.strip().lower() for skill in skills if skill and skill.strip()))
+        if not names:
+            return {}
+
+        placeholders = ", ".join("?" * len(names))
+        with self._connection() as conn:
+            cursor = conn.execute(
+                f"""SELECT p.analysis_id, COUNT(*)
+                FROM skills s
+                JOIN skill_postings p ON p.skill_id = s.id
+                WHERE s.name IN ({placeholders})
+                GROUP BY p.analysis_id""",
+                names
+            )
+            counts = dict(cursor.fetchall())
+
+        return counts
+
+    def get_candidate_analyses(self, analysis_ids):
+        """Get decoded analyses plus their resume's filename and owner, keyed by analysis ID"""
+        analyses = {}
+        analysis_ids = list(analysis_ids)
+        with self._connection() as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(analysis_ids), 500):
+                chunk = analysis_ids[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor = conn.execute(
+                    f"""SELECT a.*, r.filename, r.user_id
+                    FROM analysis_results a
+                    JOIN resumes r ON r.id = a.resume_id
+                    WHERE a.id IN ({placeholders})""",
+                    chunk
+                )
+                for row in cursor.fetchall():
+                    analyses[row['id']] = self._decode_analysis(row)
+
+        return analyses
+
+    def iter_latest_analyses(self, batch_size=500):
+        """Yield the latest analysis of every resume, newest first, one batch at a time"""
+        last_id = 2 ** 63 - 1  # Larger than any rowid
+        while True:
+            with self._connection() as conn:
+                cursor = conn.execute(
+                    """SELECT a.*, r.filename, r.user_id
+                    FROM analysis_results a
+                    JOIN resumes r ON r.id = a.resume_id
+                    WHERE a.id < ?
+                    AND NOT EXISTS (
+                        SELECT 1 FROM analysis_results newer
+                        WHERE newer.resume_id = a.resume_id AND newer.id > a.id
+                    )
+                    ORDER BY a.id DESC
+                    LIMIT ?""",
+                    (last_id, batch_size)
+                )
+                rows = cursor.fetchall()
+
+            if not rows:
+                return
+            yield [self._decode_analysis(row) for row in rows]
+            last_id = rows[-1]['id']
+
     def get_resume_score(self, resume_id):
         """Get only the score for a specific resume (for display in cards)"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT score FROM analysis_results WHERE resume_id = ? ORDER BY analyzed_at DESC", (resume_id,))
-        result = cursor.fetchone()
-        conn.close()
+        with self._connection() as conn:
+            result = conn.execute(
+                "SELECT score FROM analysis_results WHERE resume_id = ? ORDER BY analyzed_at DESC, id DESC",
+                (resume_id,)
+            ).fetchone()
         
         if result:
             return result['score']
@@ -162,29 +522,22 @@ class DatabaseManager:
     # Job Posting Management (for recruiters)
     def create_job_posting(self, user_id, title, description, required_skills, required_education, required_experience):
         """Create a new job posting"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            """INSERT INTO job_postings 
-            (user_id, title, description, required_skills, required_education, required_experience) 
-            VALUES (?, ?, ?, ?, ?, ?)""",
-            (user_id, title, description, required_skills, required_education, required_experience)
-        )
-        conn.commit()
-        job_id = cursor.lastrowid
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                """INSERT INTO job_postings
+                (user_id, title, description, required_skills, required_education, required_experience)
+                VALUES (?, ?, ?, ?, ?, ?)""",
+                (user_id, title, description, required_skills, required_education, required_experience)
+            )
+            job_id = cursor.lastrowid
         
+        self._notify(JOB_POSTED, [job_id])
         return job_id
     
     def get_job_posting(self, job_id):
         """Get job posting information"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM job_postings WHERE id = ?", (job_id,))
-        job = cursor.fetchone()
-        conn.close()
+        with self._connection() as conn:
+            job = conn.execute("SELECT * FROM job_postings WHERE id = ?", (job_id,)).fetchone()
         
         if job:
             return dict(job)
@@ -193,78 +546,319 @@ class DatabaseManager:
     
     def get_recruiter_jobs(self, user_id):
         """Get all job postings for a recruiter"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM job_postings WHERE user_id = ? ORDER BY posted_at DESC", (user_id,))
-        jobs = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.execute("SELECT * FROM job_postings WHERE user_id = ? ORDER BY posted_at DESC", (user_id,))
+            jobs = [dict(row) for row in cursor.fetchall()]
         
         return jobs
     
     def get_all_jobs(self):
         """Get all job postings"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM job_postings ORDER BY posted_at DESC")
-        jobs = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.execute("SELECT * FROM job_postings ORDER BY posted_at DESC")
+            jobs = [dict(row) for row in cursor.fetchall()]
         
         return jobs
     
+    def get_recruiter_jobs_page(self, user_id, limit=20, before=None):
+        """Get one page of a recruiter's job postings, newest first; returns (jobs, next_cursor)
+
+        before is the (posted_at, id) cursor returned with the previous page.
+        """
+        with self._connection() as conn:
+            cursor = conn.execute(
+                f"""SELECT * FROM job_postings
+                WHERE user_id = ? {"AND (posted_at, id) < (?, ?)" if before else ""}
+                ORDER BY posted_at DESC, id DESC
+                LIMIT ?""",
+                (user_id, *(before or ()), limit + 1)
+            )
+            jobs = [dict(row) for row in cursor.fetchall()]
+
+        return _split_page(jobs, limit, ("posted_at", "id"))
+
+    def get_all_jobs_page(self, limit=20, before=None):
+        """Get one page of all job postings, newest first; returns (jobs, next_cursor)
+
+        before is the (posted_at, id) cursor returned with the previous page.
+        """
+        with self._connection() as conn:
+            cursor = conn.execute(
+                f"""SELECT * FROM job_postings
+                {"WHERE (posted_at, id) < (?, ?)" if before else ""}
+                ORDER BY posted_at DESC, id DESC
+                LIMIT ?""",
+                (*(before or ()), limit + 1)
+            )
+            jobs = [dict(row) for row in cursor.fetchall()]
+
+        return _split_page(jobs, limit, ("posted_at", "id"))
+
+    def count_jobs(self):
+        """Get the number of job postings"""
+        with self._connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM job_postings").fetchone()[0]
+
+        return count
+
     # Resume-Job Matching
-    def save_resume_job_match(self, resume_id, job_id, match_score, match_details):
-        """Save a resume-job match result"""
-        conn = self._connect()
-        cursor = conn.cursor()
-        
+    _UPSERT_MATCH = """INSERT INTO resume_job_matches (resume_id, job_id, analysis_id, match_score, match_details)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (resume_id, job_id) DO UPDATE SET
+            analysis_id = excluded.analysis_id,
+            match_score = excluded.match_score,
+            match_details = excluded.match_details,
+            matched_at = CURRENT_TIMESTAMP
+        WHERE (
+            -- Never let a late write from an older analysis replace a newer result
+            excluded.analysis_id IS NULL OR resume_job_matches.analysis_id IS NULL
+            OR excluded.analysis_id >= resume_job_matches.analysis_id
+        ) AND (
+            resume_job_matches.analysis_id IS NOT excluded.analysis_id
+            OR match_score IS NOT excluded.match_score
+            OR match_details IS NOT excluded.match_details
+        )"""
+        
+    def save_resume_job_match(self, resume_id, job_id, match_score, match_details, analysis_id=None):
+        """Save a resume-job match result (replacing any earlier one for the pair)"""
         # Convert match_details list to string
         if isinstance(match_details, list):
             match_details = "\n".join(match_details)
         
-        cursor.execute(
-            "INSERT INTO resume_job_matches (resume_id, job_id, match_score, match_details) VALUES (?, ?, ?, ?)",
-            (resume_id, job_id, match_score, match_details)
-        )
-        conn.commit()
-        match_id = cursor.lastrowid
-        conn.close()
+        with self._connection() as conn:
+            conn.execute(self._UPSERT_MATCH, (resume_id, job_id, analysis_id, match_score, match_details))
+            match_id = conn.execute(
+                "SELECT id FROM resume_job_matches WHERE resume_id = ? AND job_id = ?", (resume_id, job_id)
+            ).fetchone()['id']
         
+        self._notify(MATCHES_SAVED, [(resume_id, job_id)])
         return match_id
     
-    def get_resume_job_matches(self, resume_id=None, job_id=None):
-        """Get resume-job match results"""
-        conn = self._connect()
-        cursor = conn.cursor()
+    def save_resume_job_matches(self, resume_id, analysis_id, matches):
+        """Upsert many match results for one resume analysis in a single transaction
+        
+        matches is an iterable of (job_id, match_score, match_details) tuples.
+        Rows that already hold the same result are left untouched.
+        """
+        self._upsert_matches(
+            (resume_id, job_id, analysis_id, match_score, match_details)
+            for job_id, match_score, match_details in matches
+        )
+
+    def save_job_matches(self, job_id, matches):
+        """Upsert many match results for one job posting in a single transaction
+
+        matches is an iterable of (resume_id, analysis_id, match_score, match_details) tuples.
+        """
+        self._upsert_matches(
+            (resume_id, job_id, analysis_id, match_score, match_details)
+            for resume_id, analysis_id, match_score, match_details in matches
+        )
+
+    def _upsert_matches(self, matches):
+        rows = [
+            (resume_id, job_id, analysis_id, match_score,
+             "\n".join(match_details) if isinstance(match_details, list) else match_details)
+            for resume_id, job_id, analysis_id, match_score, match_details in matches
+        ]
+        if not rows:
+            return
+
+        with self._connection() as conn:
+            conn.executemany(self._UPSERT_MATCH, rows)
+        self._notify(MATCHES_SAVED, [(row[0], row[1]) for row in rows])
+
+    def get_current_match_job_ids(self, resume_id, analysis_id):
+        """Return the IDs of jobs whose stored match for this resume was scored from analysis_id"""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "SELECT job_id FROM resume_job_matches WHERE resume_id = ? AND analysis_id = ?",
+                (resume_id, analysis_id)
+            )
+            job_ids = {row['job_id'] for row in cursor.fetchall()}
+        
+        return job_ids
+
+    def get_resume_job_matches(self, resume_id=None, job_id=None, analysis_id=None):
+        """Get resume-job match results
+
+        With analysis_id, only matches scored from that analysis of the resume are returned.
+        """
+        with self._connection() as conn:
+            if resume_id and job_id:
+                cursor = conn.execute(
+                    "SELECT * FROM resume_job_matches WHERE resume_id = ? AND job_id = ?",
+                    (resume_id, job_id)
+                )
+            elif resume_id:
+                cursor = conn.execute(
+                    """SELECT m.*, j.title, j.description, j.required_skills
+                    FROM resume_job_matches m
+                    JOIN job_postings j ON m.job_id = j.id
+                    WHERE m.resume_id = ? AND (? IS NULL OR m.analysis_id = ?)
+                    ORDER BY m.match_score DESC""",
+                    (resume_id, analysis_id, analysis_id)
+                )
+            elif job_id:
+                cursor = conn.execute(
+                    """SELECT m.*, r.filename
+                    FROM resume_job_matches m
+                    JOIN resumes r ON m.resume_id = r.id
+                    WHERE m.job_id = ?
+                    ORDER BY m.match_score DESC""",
+                    (job_id,)
+                )
+            else:
+                cursor = conn.execute("SELECT * FROM resume_job_matches ORDER BY matched_at DESC")
+
+            matches = [dict(row) for row in cursor.fetchall()]
         
-        if resume_id and job_id:
-            cursor.execute(
-                "SELECT * FROM resume_job_matches WHERE resume_id = ? AND job_id = ?", 
-                (resume_id, job_id)
+        return matches
+
+    def get_resume_job_matches_page(self, resume_id=None, job_id=None, analysis_id=None, limit=20, before=None):
+        """Get one page of a resume's or a job's matches, best first; returns (matches, next_cursor)
+
+        Rows carry the same joined columns as get_resume_job_matches. before
+        is the (match_score, id) cursor returned with the previous page.
+        """
+        if resume_id:
+            query = """SELECT m.*, j.title, j.description, j.required_skills
+                FROM resume_job_matches m
+                JOIN job_postings j ON m.job_id = j.id
+                WHERE m.resume_id = ? AND (? IS NULL OR m.analysis_id = ?)"""
+            params = [resume_id, analysis_id, analysis_id]
+        elif job_id:
+            query = """SELECT m.*, r.filename
+                FROM resume_job_matches m
+                JOIN resumes r ON m.resume_id = r.id
+                WHERE m.job_id = ?"""
+            params = [job_id]
+        else:
+            raise ValueError("resume_id or job_id is required")
+
+        if before:
+            query += " AND (m.match_score, m.id) < (?, ?)"
+            params.extend(before)
+
+        with self._connection() as conn:
+            cursor = conn.execute(query + " ORDER BY m.match_score DESC, m.id DESC LIMIT ?", (*params, limit + 1))
+            matches = [dict(row) for row in cursor.fetchall()]
+
+        return _split_page(matches, limit, ("match_score", "id"))
+
+    def count_resume_job_matches(self, resume_id, analysis_id=None):
+        """Get the number of stored matches for a resume (optionally only those scored from analysis_id)"""
+        with self._connection() as conn:
+            count = conn.execute(
+                "SELECT COUNT(*) FROM resume_job_matches WHERE resume_id = ? AND (? IS NULL OR analysis_id = ?)",
+                (resume_id, analysis_id, analysis_id)
+            ).fetchone()[0]
+
+        return count
+
+    # Background analysis jobs
+    def create_analysis_job(self, file_path, filename=None, user_id=None, resume_id=None, content_hash=None):
+        """Queue a resume file for analysis; resume_id None means the result is not saved as an analysis"""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                """INSERT INTO analysis_jobs (user_id, resume_id, filename, file_path, content_hash)
+                VALUES (?, ?, ?, ?, ?)""",
+                (user_id, resume_id, filename, file_path, content_hash)
             )
-        elif resume_id:
-            cursor.execute(
-                """SELECT m.*, j.title, j.description 
-                FROM resume_job_matches m 
-                JOIN job_postings j ON m.job_id = j.id 
-                WHERE m.resume_id = ? 
-                ORDER BY m.match_score DESC""", 
-                (resume_id,)
+            job_id = cursor.lastrowid
+
+        return job_id
+
+    def claim_analysis_job(self):
+        """Mark the oldest queued job as running and return it, or None if the queue is empty"""
+        with self._connection() as conn:
+            # Take the write lock first so two workers never claim the same job
+            conn.execute("BEGIN IMMEDIATE")
+            job = conn.execute(
+                "SELECT * FROM analysis_jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if job is None:
+                return None
+            conn.execute(
+                "UPDATE analysis_jobs SET status = 'running', started_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (job['id'],)
             )
-        elif job_id:
-            cursor.execute(
-                """SELECT m.*, r.filename 
-                FROM resume_job_matches m 
-                JOIN resumes r ON m.resume_id = r.id 
-                WHERE m.job_id = ? 
-                ORDER BY m.match_score DESC""", 
-                (job_id,)
+
+        return dict(job, status='running')
+
+    def update_analysis_job_progress(self, job_id, stage, partial=None):
+        """Record the last finished stage of a running job and the results so far"""
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE analysis_jobs SET stage = ?, partial_json = ? WHERE id = ?",
+                (stage, json.dumps(partial) if partial is not None else None, job_id)
+            )
+
+    def finish_analysis_job(self, job_id, result=None, error=None):
+        """Store a job's result (status 'done') or its error (status 'failed')"""
+        with self._connection() as conn:
+            conn.execute(
+                """UPDATE analysis_jobs
+                SET status = ?, result_json = ?, error = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE id = ?""",
+                ('failed' if error else 'done', json.dumps(result) if result is not None else None, error, job_id)
             )
+
+    def requeue_running_analysis_jobs(self):
+        """Put jobs left 'running' by a stopped process back in the queue; returns how many"""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "UPDATE analysis_jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            )
+            count = cursor.rowcount
+
+        return count
+
+    def count_queued_analysis_jobs(self):
+        with self._connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM analysis_jobs WHERE status = 'queued'").fetchone()[0]
+
+        return count
+
+    @staticmethod
+    def _decode_analysis_job(row):
+        job = dict(row)
+        for field in ('partial', 'result'):
+            encoded = job.pop(f"{field}_json")
+            job[field] = json.loads(encoded) if encoded is not None else None
+        return job
+
+    def get_analysis_job(self, job_id):
+        """Get a background analysis job with its decoded partial and final results"""
+        with self._connection() as conn:
+            job = conn.execute("SELECT * FROM analysis_jobs WHERE id = ?", (job_id,)).fetchone()
+
+        if job:
+            return self._decode_analysis_job(job)
         else:
-            cursor.execute("SELECT * FROM resume_job_matches ORDER BY matched_at DESC")
-        
-        matches = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        
-        return matches
+            return None
+
+    def get_user_analysis_jobs(self, user_id, limit=10):
+        """Get a user's most recent background analysis jobs (without their results)"""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                """SELECT id, user_id, resume_id, filename, file_path, status, stage, error, created_at, finished_at
+                FROM analysis_jobs WHERE user_id = ?
+                ORDER BY created_at DESC, id DESC LIMIT ?""",
+                (user_id, limit)
+            )
+            jobs = [dict(row) for row in cursor.fetchall()]
+
+        return jobs
+
+    def delete_finished_analysis_jobs(self, older_than_days=7):
+        """Delete finished or failed jobs older than the given age; returns how many"""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                """DELETE FROM analysis_jobs
+                WHERE status IN ('done', 'failed') AND finished_at < datetime('now', ?)""",
+                (f"-{older_than_days} days",)
+            )
+            count = cursor.rowcount
+
+        return count
@@ -1,17 +1,11 @@
 import sqlite3
 import os
+import json
 
-def create_database():
-    """Create SQLite database for storing resume data and analysis results"""
-    
-    # Check if database directory exists, if not create it
-    os.makedirs('database', exist_ok=True)
-    
-    # Connect to database (will create if doesn't exist)
-    conn = sqlite3.connect('database/resume_analyzer.db')
-    cursor = conn.cursor()
-    
-    # Create tables
+DEFAULT_DB_PATH = 'database/resume_analyzer.db'
+
+def create_tables(cursor):
+    """Create the base tables (schema version 0) if they don't exist"""
     
     # Users table
     cursor.execute('''
@@ -80,8 +74,205 @@ def create_database():
     )
     ''')
     
-    # Commit changes and close connection
+# List-valued analysis fields, stored as JSON arrays in <field>_json columns
+ANALYSIS_LIST_FIELDS = ('skills', 'education', 'experience', 'feedback')
+
+def link_analysis_skills(conn, analysis_id, skills):
+    """Record an analysis's skills in the normalized skills/analysis_skills tables"""
+    names = list(dict.fromkeys(skill.strip().lower() for skill in skills if skill and skill.strip()))
+    if not names:
+        return
+    
+    conn.executemany("INSERT OR IGNORE INTO skills (name) VALUES (?)", [(name,) for name in names])
+    placeholders = ", ".join("?" * len(names))
+    conn.execute(
+        f"""INSERT OR IGNORE INTO analysis_skills (analysis_id, skill_id)
+        SELECT ?, id FROM skills WHERE name IN ({placeholders})""",
+        (analysis_id, *names)
+    )
+
+def _backfill_analysis_json(conn, batch_size=1000):
+    """Copy legacy comma-joined analysis fields into the JSON columns and skill tables"""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            """SELECT id, skills, education, experience, feedback FROM analysis_results
+            WHERE id > ? ORDER BY id LIMIT ?""",
+            (last_id, batch_size)
+        ).fetchall()
+        if not rows:
+            break
+        
+        for analysis_id, *values in rows:
+            # Entries that contained ", " were already split apart when they
+            # were stored; this is the best that can be recovered
+            lists = [value.split(", ") if value else [] for value in values]
+            conn.execute(
+                """UPDATE analysis_results
+                SET skills_json = ?, education_json = ?, experience_json = ?, feedback_json = ?
+                WHERE id = ?""",
+                (*(json.dumps(items) for items in lists), analysis_id)
+            )
+            link_analysis_skills(conn, analysis_id, lists[0])
+        last_id = rows[-1][0]
+
+# Schema migrations, applied in order on top of the base tables.
+# The applied version is stored in PRAGMA user_version. Each step is either
+# an SQL statement or a callable taking the connection.
+MIGRATIONS = [
+    (1, "Indexes for the per-user, per-resume and per-job access paths", [
+        # Latest analysis / score of a resume (covers get_resume_score)
+        "CREATE INDEX IF NOT EXISTS idx_analysis_results_resume ON analysis_results (resume_id, analyzed_at, score)",
+        "CREATE INDEX IF NOT EXISTS idx_resumes_user ON resumes (user_id, uploaded_at)",
+        "CREATE INDEX IF NOT EXISTS idx_matches_job ON resume_job_matches (job_id, match_score)",
+        "CREATE INDEX IF NOT EXISTS idx_matches_resume ON resume_job_matches (resume_id, match_score)",
+        "CREATE INDEX IF NOT EXISTS idx_job_postings_user ON job_postings (user_id, posted_at)",
+        "CREATE INDEX IF NOT EXISTS idx_job_postings_posted ON job_postings (posted_at)",
+    ]),
+    (2, "Normalized skills and JSON-encoded analysis fields", [
+        """CREATE TABLE IF NOT EXISTS skills (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL COLLATE NOCASE
+        )""",
+        """CREATE TABLE IF NOT EXISTS analysis_skills (
+            analysis_id INTEGER NOT NULL,
+            skill_id INTEGER NOT NULL,
+            PRIMARY KEY (analysis_id, skill_id),
+            FOREIGN KEY (analysis_id) REFERENCES analysis_results(id),
+            FOREIGN KEY (skill_id) REFERENCES skills(id)
+        ) WITHOUT ROWID""",
+        # Skill -> analyses lookups ("every candidate with kubernetes and golang")
+        "CREATE INDEX IF NOT EXISTS idx_analysis_skills_skill ON analysis_skills (skill_id, analysis_id)",
+        "ALTER TABLE analysis_results ADD COLUMN skills_json TEXT",
+        "ALTER TABLE analysis_results ADD COLUMN education_json TEXT",
+        "ALTER TABLE analysis_results ADD COLUMN experience_json TEXT",
+        "ALTER TABLE analysis_results ADD COLUMN feedback_json TEXT",
+        _backfill_analysis_json,
+    ]),
+    (3, "Skill posting lists over each resume's latest analysis", [
+        # skill -> analyses, clustered by skill so a posting list is one range scan
+        """CREATE TABLE IF NOT EXISTS skill_postings (
+            skill_id INTEGER NOT NULL,
+            analysis_id INTEGER NOT NULL,
+            PRIMARY KEY (skill_id, analysis_id)
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS idx_skill_postings_analysis ON skill_postings (analysis_id)",
+        """INSERT OR IGNORE INTO skill_postings (skill_id, analysis_id)
+        SELECT sa.skill_id, sa.analysis_id
+        FROM analysis_skills sa
+        JOIN analysis_results a ON a.id = sa.analysis_id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM analysis_results newer
+            WHERE newer.resume_id = a.resume_id AND newer.id > a.id
+        )""",
+    ]),
+    (4, "One match row per resume and job, tagged with the analysis it was scored from", [
+        "ALTER TABLE resume_job_matches ADD COLUMN analysis_id INTEGER REFERENCES analysis_results(id)",
+        # Keep only the newest of the rows every page render used to add
+        """DELETE FROM resume_job_matches WHERE id NOT IN (
+            SELECT MAX(id) FROM resume_job_matches GROUP BY resume_id, job_id
+        )""",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_matches_resume_job ON resume_job_matches (resume_id, job_id)",
+    ]),
+    (5, "Persistent queue of background analysis jobs", [
+        """CREATE TABLE IF NOT EXISTS analysis_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            resume_id INTEGER,
+            filename TEXT,
+            file_path TEXT NOT NULL,
+            status TEXT CHECK(status IN ('queued', 'running', 'done', 'failed')) NOT NULL DEFAULT 'queued',
+            stage TEXT,
+            partial_json TEXT,
+            result_json TEXT,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            FOREIGN KEY (resume_id) REFERENCES resumes(id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status ON analysis_jobs (status, id)",
+        "CREATE INDEX IF NOT EXISTS idx_analysis_jobs_user ON analysis_jobs (user_id, created_at)",
+    ]),
+    (6, "Content hashes of resume files, referencing the upload blob store", [
+        "ALTER TABLE resumes ADD COLUMN content_hash TEXT",
+        # Reference counts and garbage collection of blobs
+        "CREATE INDEX IF NOT EXISTS idx_resumes_content_hash ON resumes (content_hash)",
+        # Files saved before this version are moved into the store by
+        # "python -m utils.blob_store --import-legacy", outside this transaction
+    ]),
+    (7, "API keys for the HTTP API", [
+        # Only a SHA-256 of each key is stored
+        """CREATE TABLE IF NOT EXISTS api_keys (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            key_hash TEXT UNIQUE NOT NULL,
+            name TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )""",
+    ]),
+    (8, "Content hashes of queued resume files", [
+        # Set when the file was hashed while it was stored, so the worker doesn't read it again
+        "ALTER TABLE analysis_jobs ADD COLUMN content_hash TEXT",
+    ]),
+]
+
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn):
+    """Return the schema version recorded in the database"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn):
+    """Apply pending migrations in place; returns the resulting schema version"""
+    if get_schema_version(conn) >= LATEST_SCHEMA_VERSION:
+        return LATEST_SCHEMA_VERSION
+    
     conn.commit()
+    for version, description, steps in MIGRATIONS:
+        # Take the write lock before re-checking so concurrent processes
+        # never apply the same migration twice
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+            print(f"Applied database migration {version}: {description}")
+        except Exception:
+            conn.rollback()
+            raise
+    
+    return get_schema_version(conn)
+
+def initialize_database(conn):
+    """Create missing tables and bring the schema up to date"""
+    create_tables(conn.cursor())
+    conn.commit()
+    return migrate(conn)
+
+def create_database(db_path=DEFAULT_DB_PATH):
+    """Create SQLite database for storing resume data and analysis results"""
+    
+    # Check if database directory exists, if not create it
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    
+    # Connect to database (will create if doesn't exist)
+    conn = sqlite3.connect(db_path)
+    
+    # Create tables and apply migrations
+    initialize_database(conn)
+    
+    # Close connection
     conn.close()
     
     print("Database created successfully!")
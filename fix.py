@@ -122,6 +122,23 @@ def check_css_file():
         print("CSS file exists.")
         return True
 
+def download_animations():
+    """Download the Lottie animations so the app can run offline."""
+    print("Downloading animations...")
+    try:
+        from utils.assets import LOTTIE_DIR, download_lottie_assets
+        failed = download_lottie_assets()
+    except Exception as e:
+        print(f"Error downloading animations: {str(e)}")
+        return True
+    if failed:
+        # Not fatal: the app falls back to a built-in animation
+        print(f"Could not download animations: {', '.join(failed)}")
+        print("Try running manually: python -m utils.assets")
+    else:
+        print(f"Animations saved to {LOTTIE_DIR}.")
+    return True
+
 def main():
     """Main function to fix common issues."""
     print("\nResumeIQ Web Application - Fix Script")
@@ -140,7 +157,8 @@ def main():
         install_dependencies(),
         download_spacy_model(),
         setup_database(),
-        check_css_file()
+        check_css_file(),
+        download_animations()
     ]
     
     if all(checks):
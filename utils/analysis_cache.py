@@ -0,0 +1,122 @@
+"""
+Content-addressed cache for resume analysis results.
+
+Entries are keyed by the SHA-256 of the uploaded file plus the analysis
+version, stored in a small SQLite database and evicted least-recently-used
+first once the entry count or total payload size exceeds its limits.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from database.connection import get_pool
+
+CACHE_DB_PATH = os.path.join('cache', 'analysis_cache.db')
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def file_sha256(file_path):
+    """Return the hex SHA-256 digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_cache_key(content_hash, version):
+    """Combine a content hash with the parser/taxonomy version"""
+    return f"{content_hash}:{version}"
+
+
+class AnalysisCache:
+    """Persistent LRU cache of analysis dicts"""
+
+    def __init__(self, db_path=CACHE_DB_PATH, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._pool = get_pool(db_path)
+
+        with self._pool.connection() as conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                cache_key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_access ON analysis_cache (last_access)")
+
+    def get(self, cache_key):
+        """Return the cached analysis for a key, or None on a miss"""
+        try:
+            with self._pool.connection() as conn:
+                row = conn.execute(
+                    "SELECT payload FROM analysis_cache WHERE cache_key = ?", (cache_key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    "UPDATE analysis_cache SET last_access = ? WHERE cache_key = ?", (time.time(), cache_key)
+                )
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Error reading analysis cache: {e}")
+            return None
+
+    def put(self, cache_key, analysis):
+        """Store an analysis and evict old entries if the cache is over its limits"""
+        payload = json.dumps(analysis)
+        try:
+            with self._pool.connection() as conn:
+                conn.execute(
+                    """INSERT OR REPLACE INTO analysis_cache (cache_key, payload, size, last_access)
+                    VALUES (?, ?, ?, ?)""",
+                    (cache_key, payload, len(payload), time.time())
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"Error writing analysis cache: {e}")
+
+    def _evict(self, conn):
+        count, total_size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analysis_cache"
+        ).fetchone()
+        if count <= self.max_entries and total_size <= self.max_bytes:
+            return
+
+        # Walk entries from least to most recently used until both limits hold
+        to_delete = []
+        for cache_key, size in conn.execute("SELECT cache_key, size FROM analysis_cache ORDER BY last_access"):
+            if count <= self.max_entries and total_size <= self.max_bytes:
+                break
+            to_delete.append((cache_key,))
+            count -= 1
+            total_size -= size
+
+        conn.executemany("DELETE FROM analysis_cache WHERE cache_key = ?", to_delete)
+
+    def clear(self):
+        """Remove every cached analysis"""
+        with self._pool.connection() as conn:
+            conn.execute("DELETE FROM analysis_cache")
+
+
+def get_analysis_cache():
+    """Return the process-wide analysis cache"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = AnalysisCache()
+    return _default_cache
@@ -0,0 +1,127 @@
+"""
+Static UI assets, read once per process.
+
+Lottie animations are bundled in static/lottie/ and read from there; the
+app never needs the network for them. With RESUMEIQ_FETCH_ASSETS set, an
+animation missing there is downloaded from LOTTIE_URLS on first use and
+saved. Animations that were found are memoized for the life of the
+process; lookups that failed are retried on the next render. To download
+any missing animations, or with --force to refresh every bundled file from
+LOTTIE_URLS, run:
+
+    python -m utils.assets [--force]
+"""
+import functools
+import json
+import os
+import sys
+import threading
+
+LOTTIE_DIR = os.path.join('static', 'lottie')
+CSS_PATH = os.path.join('static', 'css', 'style.css')
+
+# Animations used by the app
+LOTTIE_URLS = {
+    "login": "https://assets3.lottiefiles.com/packages/lf20_q7hibrh9.json",
+    "signup": "https://assets5.lottiefiles.com/packages/lf20_q5pk6p1k.json",
+    "upload": "https://assets9.lottiefiles.com/packages/lf20_nw19osms.json",
+    "empty": "https://assets5.lottiefiles.com/packages/lf20_ydo1amjm.json",
+    "success": "https://assets6.lottiefiles.com/packages/lf20_swnc1xqy.json",
+    "about": "https://assets1.lottiefiles.com/packages/lf20_v4isjbj5.json",
+}
+
+DOWNLOAD_TIMEOUT = 5
+
+_lottie_cache = {}
+_lottie_cache_lock = threading.Lock()
+
+
+def fetch_enabled():
+    """True when RESUMEIQ_FETCH_ASSETS allows downloading missing animations"""
+    return os.environ.get('RESUMEIQ_FETCH_ASSETS', '').lower() in ('1', 'true', 'yes')
+
+
+def lottie_path(name, lottie_dir=LOTTIE_DIR):
+    return os.path.join(lottie_dir, f"{name}.json")
+
+
+def download_lottie(name, lottie_dir=LOTTIE_DIR):
+    """Fetch an animation from LOTTIE_URLS and save it locally; returns the parsed JSON or None"""
+    import requests
+
+    try:
+        response = requests.get(LOTTIE_URLS[name], timeout=DOWNLOAD_TIMEOUT)
+        if response.status_code != 200:
+            print(f"Error downloading animation {name}: HTTP {response.status_code}")
+            return None
+        animation = response.json()
+    except (requests.RequestException, ValueError) as e:
+        print(f"Error downloading animation {name}: {e}")
+        return None
+
+    try:
+        os.makedirs(lottie_dir, exist_ok=True)
+        tmp_path = f"{lottie_path(name, lottie_dir)}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(animation, f)
+        os.replace(tmp_path, lottie_path(name, lottie_dir))
+    except OSError as e:
+        print(f"Error saving animation {name}: {e}")
+    return animation
+
+
+def load_lottie(name):
+    """Return a bundled Lottie animation by name, or None if it is unavailable"""
+    with _lottie_cache_lock:
+        if name in _lottie_cache:
+            return _lottie_cache[name]
+
+    animation = _read_lottie(name)
+    if animation is None and fetch_enabled() and name in LOTTIE_URLS:
+        animation = download_lottie(name)
+
+    # Failures are not memoized, so an animation bundled or fetched later still shows up
+    if animation is not None:
+        with _lottie_cache_lock:
+            _lottie_cache[name] = animation
+    return animation
+
+
+def _read_lottie(name):
+    try:
+        with open(lottie_path(name)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error reading animation {name}: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def load_css_text(path=CSS_PATH):
+    """Return the app stylesheet, or None if it is missing"""
+    try:
+        with open(path) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def download_lottie_assets(force=False, lottie_dir=LOTTIE_DIR):
+    """Save every animation in LOTTIE_URLS under lottie_dir; returns the names that failed"""
+    failed = []
+    for name in LOTTIE_URLS:
+        if not force and os.path.exists(lottie_path(name, lottie_dir)):
+            continue
+        if download_lottie(name, lottie_dir) is None:
+            failed.append(name)
+    return failed
+
+
+if __name__ == "__main__":
+    missing = download_lottie_assets(force='--force' in sys.argv[1:])
+    if missing:
+        print(f"Could not download: {', '.join(missing)}")
+    else:
+        print(f"Animations saved to {LOTTIE_DIR}")
@@ -0,0 +1,143 @@
+"""
+Batch resume analysis.
+
+Fans analyze_resume out over a process pool and stores the results in
+analysis_results in batched transactions. Run from the project root:
+
+    python -m utils.batch_analyzer path/to/resumes --workers 4 --user-id 1
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from database.connection import DEFAULT_DB_PATH
+from database.db_manager import DatabaseManager
+from utils.resume_parser import NER_BATCH_SIZE
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+DEFAULT_BATCH_SIZE = 50
+
+
+def _init_worker(use_ner):
+    """Load the parser, skill matcher and (if needed) spaCy model once per worker process"""
+    from utils import resume_parser
+    resume_parser.get_taxonomy()
+    if use_ner:
+        resume_parser.get_nlp()
+
+
+def _analyze_chunk(file_paths, use_ner):
+    """Analyze a chunk of resumes inside a worker process"""
+    from utils.resume_parser import analyze_resume, analyze_resume_batch
+    try:
+        if use_ner:
+            # One nlp.pipe call for the whole chunk
+            analyses = analyze_resume_batch(file_paths, use_ner=True)
+        else:
+            analyses = [analyze_resume(file_path) for file_path in file_paths]
+        return list(zip(file_paths, analyses))
+    except Exception as e:
+        return [(file_path, {"status": "error", "message": str(e)}) for file_path in file_paths]
+
+
+def collect_resume_paths(paths):
+    """Expand directories into the resume files they contain"""
+    resume_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        resume_paths.append(os.path.join(root, name))
+        else:
+            resume_paths.append(path)
+    return resume_paths
+
+
+def analyze_resumes(paths, workers=None, user_id=None, db_path=DEFAULT_DB_PATH,
+                    batch_size=DEFAULT_BATCH_SIZE, save=True, use_ner=False, chunk_size=None):
+    """Analyze many resumes in parallel.
+
+    Yields (file_path, analysis) tuples as soon as each resume is done, in
+    completion order. When save is True, successful analyses are written to
+    the resumes and analysis_results tables every batch_size results.
+
+    Each worker task handles chunk_size resumes. With use_ner the default is
+    NER_BATCH_SIZE so the NER stage runs over a whole chunk at once.
+    """
+    paths = list(paths)
+    if chunk_size is None:
+        chunk_size = NER_BATCH_SIZE if use_ner else 1
+    db = DatabaseManager(db_path) if save else None
+    pending = []
+
+    def flush():
+        if db and pending:
+            db.save_resume_analyses(user_id, [
+                (os.path.basename(file_path), file_path, analysis) for file_path, analysis in pending
+            ])
+        pending.clear()
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(use_ner,))
+    completed = False
+    try:
+        futures = [executor.submit(_analyze_chunk, paths[start:start + chunk_size], use_ner)
+                   for start in range(0, len(paths), chunk_size)]
+        for future in as_completed(futures):
+            for file_path, analysis in future.result():
+                if analysis["status"] == "success":
+                    pending.append((file_path, analysis))
+                    if len(pending) >= batch_size:
+                        flush()
+                yield file_path, analysis
+        completed = True
+    finally:
+        flush()
+        # Drop queued work if the caller stopped iterating early
+        executor.shutdown(wait=True, cancel_futures=not completed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze resumes in bulk and store the results")
+    parser.add_argument("paths", nargs="+", help="Resume files or directories containing them")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--user-id", type=int, default=None, help="Owner of the imported resumes")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Results per database transaction")
+    parser.add_argument("--db-path", default=DEFAULT_DB_PATH, help="SQLite database to write to")
+    parser.add_argument("--no-save", action="store_true", help="Analyze only, do not write to the database")
+    parser.add_argument("--ner", action="store_true", help="Run spaCy NER to enrich education and experience")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Resumes per worker task")
+    args = parser.parse_args(argv)
+
+    paths = collect_resume_paths(args.paths)
+    if not paths:
+        print("No resumes found.")
+        return 1
+
+    if not args.no_save:
+        # Score the imported resumes against the job postings as batches are stored
+        from utils.incremental_matcher import start_incremental_matching
+        start_incremental_matching()
+
+    succeeded = failed = 0
+    for file_path, analysis in analyze_resumes(paths, workers=args.workers, user_id=args.user_id,
+                                               db_path=args.db_path, batch_size=args.batch_size,
+                                               save=not args.no_save, use_ner=args.ner,
+                                               chunk_size=args.chunk_size):
+        if analysis["status"] == "success":
+            succeeded += 1
+            print(f"OK    {file_path}  score={analysis['score']}  skills={len(analysis['skills'])}")
+        else:
+            failed += 1
+            print(f"ERROR {file_path}  {analysis['message']}")
+
+    print(f"\nAnalyzed {succeeded + failed} resumes: {succeeded} succeeded, {failed} failed.")
+    if not args.no_save:
+        from utils.incremental_matcher import stop_incremental_matching
+        stop_incremental_matching()
+    return 0 if failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
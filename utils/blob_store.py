@@ -0,0 +1,223 @@
+"""
+Content-addressed store for uploaded resume files.
+
+Each distinct file is kept once, named by its SHA-256 and sharded by the
+first two byte pairs of the hash:
+
+    uploads/blobs/ab/cd/abcd...<64 hex digits>.pdf
+
+(the extension is kept because the parsers pick the format from it).
+Uploading the same file again, under any name and by any user, reuses the
+existing blob, so disk usage grows with distinct files only. A blob is
+referenced by every resumes row with the same content_hash; blobs without
+references are removed by collect_garbage:
+
+    python -m utils.blob_store --gc
+
+Reusing a blob and removing it are serialized by an exclusive lock on
+<blob_dir>/.lock, held across processes (the app, the API and the command
+above), so a blob is never deleted between a reuse check and the upload
+that relies on it. The resume row is saved after the blob is stored, so
+garbage collection also leaves blobs younger than GC_GRACE_SECONDS alone;
+a resume row saved later than that after its upload may find its blob
+collected.
+
+Resumes saved before the store existed point at files elsewhere under
+uploads/. They keep working as they are, and are moved into the store with:
+
+    python -m utils.blob_store --import-legacy
+"""
+import argparse
+import os
+import time
+import uuid
+
+from database.connection import DEFAULT_DB_PATH
+from database.db_manager import DatabaseManager
+from utils.file_lock import file_lock
+from utils.uploads import MAX_UPLOAD_BYTES, UploadTooLarge, save_upload
+
+BLOB_DIR = os.path.join("uploads", "blobs")
+
+# Unreferenced blobs younger than this are kept: their resume row may not be saved yet
+GC_GRACE_SECONDS = 3600
+
+# Blobs checked against the database per query during garbage collection
+GC_BATCH_SIZE = 500
+
+# Resumes moved into the store per database transaction by import_legacy_resumes
+IMPORT_BATCH_SIZE = 200
+
+LOCK_NAME = ".lock"
+
+
+def _locked(blob_dir):
+    """Hold the store's exclusive lock, shared by every process using blob_dir"""
+    return file_lock(os.path.join(blob_dir, LOCK_NAME))
+
+
+def blob_path(content_hash, extension="", blob_dir=BLOB_DIR):
+    """Path of the blob with the given SHA-256 hex digest"""
+    return os.path.join(blob_dir, content_hash[:2], content_hash[2:4], f"{content_hash}{extension.lower()}")
+
+
+def store_upload(source, filename, blob_dir=BLOB_DIR, max_bytes=MAX_UPLOAD_BYTES):
+    """Save an uploaded file in the blob store; returns (content_hash, file_path)
+
+    The upload is streamed to a scratch file while it is hashed, then moved
+    into place, or dropped if a blob with the same contents already exists.
+    Raises UploadTooLarge past max_bytes.
+    """
+    incoming_dir = os.path.join(blob_dir, "incoming")
+    os.makedirs(incoming_dir, exist_ok=True)
+    incoming_path = os.path.join(incoming_dir, uuid.uuid4().hex)
+    _, content_hash = save_upload(source, incoming_path, max_bytes)
+
+    file_path = blob_path(content_hash, os.path.splitext(filename)[1], blob_dir)
+    with _locked(blob_dir):
+        try:
+            # Mark an existing blob as recently used so garbage collection waits for the new reference
+            os.utime(file_path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            os.replace(incoming_path, file_path)
+        else:
+            os.remove(incoming_path)
+    return content_hash, file_path
+
+
+def iter_blobs(blob_dir=BLOB_DIR):
+    """Yield (content_hash, file_path) for every blob in the store"""
+    for shard in sorted(os.listdir(blob_dir)) if os.path.isdir(blob_dir) else []:
+        shard_dir = os.path.join(blob_dir, shard)
+        if len(shard) != 2 or not os.path.isdir(shard_dir):
+            continue
+        for sub_shard in sorted(os.listdir(shard_dir)):
+            sub_shard_dir = os.path.join(shard_dir, sub_shard)
+            if not os.path.isdir(sub_shard_dir):
+                continue
+            for name in os.listdir(sub_shard_dir):
+                yield os.path.splitext(name)[0], os.path.join(sub_shard_dir, name)
+
+
+def collect_garbage(db_path=DEFAULT_DB_PATH, blob_dir=BLOB_DIR, grace_seconds=GC_GRACE_SECONDS):
+    """Delete blobs that no resume refers to; returns (files removed, bytes freed)"""
+    db = DatabaseManager(db_path)
+    cutoff = time.time() - grace_seconds
+    removed = freed = 0
+
+    def sweep(batch):
+        nonlocal removed, freed
+        referenced = db.get_referenced_content_hashes(content_hash for content_hash, _ in batch)
+        for content_hash, file_path in batch:
+            if content_hash in referenced:
+                continue
+            with _locked(blob_dir):
+                try:
+                    stat = os.stat(file_path)
+                    if stat.st_mtime > cutoff:
+                        continue
+                    os.remove(file_path)
+                except OSError:
+                    continue
+            removed += 1
+            freed += stat.st_size
+
+    batch = []
+    for blob in iter_blobs(blob_dir):
+        batch.append(blob)
+        if len(batch) >= GC_BATCH_SIZE:
+            sweep(batch)
+            batch = []
+    if batch:
+        sweep(batch)
+
+    # Scratch files of uploads that were interrupted
+    incoming_dir = os.path.join(blob_dir, "incoming")
+    for name in os.listdir(incoming_dir) if os.path.isdir(incoming_dir) else []:
+        file_path = os.path.join(incoming_dir, name)
+        try:
+            stat = os.stat(file_path)
+            if stat.st_mtime <= cutoff:
+                os.remove(file_path)
+                removed += 1
+                freed += stat.st_size
+        except OSError:
+            pass
+    return removed, freed
+
+
+def _in_store(file_path, blob_dir):
+    blob_dir = os.path.abspath(blob_dir)
+    return os.path.commonpath([os.path.abspath(file_path), blob_dir]) == blob_dir
+
+
+def import_legacy_resumes(db_path=DEFAULT_DB_PATH, blob_dir=BLOB_DIR, batch_size=IMPORT_BATCH_SIZE):
+    """Move resume files saved outside the store into it; returns (resumes moved, files not found)
+
+    Files are hashed and copied without holding the database's write lock;
+    each batch of resumes is then repointed in one short transaction. An
+    original file is removed once no resume refers to it any more.
+    """
+    db = DatabaseManager(db_path)
+    moved = missing = 0
+    originals = set()
+    last_id = 0
+    while True:
+        resumes = db.get_resume_files(last_id, batch_size)
+        if not resumes:
+            break
+        last_id = resumes[-1]['id']
+
+        updates = []
+        for resume in resumes:
+            file_path = resume['file_path']
+            if not file_path or _in_store(file_path, blob_dir):
+                continue
+            try:
+                with open(file_path, "rb") as f:
+                    # Files already kept are not subject to the upload limit
+                    content_hash, new_path = store_upload(f, file_path, blob_dir, os.fstat(f.fileno()).st_size)
+            except (OSError, UploadTooLarge) as e:
+                print(f"Error moving {file_path} into the blob store: {e}")
+                missing += 1
+                continue
+            updates.append((resume['id'], new_path, content_hash))
+            originals.add(file_path)
+
+        db.update_resume_files(updates)
+        moved += len(updates)
+
+    for file_path in originals - db.get_referenced_file_paths(originals):
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+    return moved, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the content-addressed upload store.")
+    parser.add_argument("--gc", action="store_true", help="Delete blobs no resume refers to")
+    parser.add_argument("--import-legacy", action="store_true",
+                        help="Move resume files saved outside the store into it")
+    parser.add_argument("--db-path", default=DEFAULT_DB_PATH, help="SQLite database holding the references")
+    parser.add_argument("--blob-dir", default=BLOB_DIR, help="Root directory of the blob store")
+    args = parser.parse_args()
+
+    if not args.gc and not args.import_legacy:
+        parser.print_help()
+        return
+
+    if args.import_legacy:
+        moved, missing = import_legacy_resumes(args.db_path, args.blob_dir)
+        print(f"Moved {moved} resumes into the blob store ({missing} files could not be read)")
+    if not args.gc:
+        return
+
+    removed, freed = collect_garbage(args.db_path, args.blob_dir)
+    print(f"Removed {removed} unreferenced files ({freed / (1024 * 1024):.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Top-K candidate search for a job posting.
+
+Candidates are the latest stored analysis of every resume. Rather than
+scoring all of them, the search reads the posting lists of the job's
+required skills (skill -> analyses) to learn how many required skills each
+candidate lists, then scores candidates with match_resume_to_job from the
+highest count down. A candidate with m of the n required skills scores at
+most m / n * 50 + 50, so the search stops once the K best scores reach the
+bound of everything not yet scored. Resumes with none of the skills are
+only read when fewer than K candidates can beat them.
+"""
+import heapq
+
+from database.db_manager import DatabaseManager
+from utils.resume_parser import match_resume_to_job
+
+DEFAULT_TOP_K = 10
+
+# Analyses fetched from the database per round trip
+SCORE_BATCH_SIZE = 500
+
+
+def _required_skills(job_posting):
+    # Parsed exactly like match_resume_to_job, so the bounds use the same denominator
+    return [skill.strip() for skill in job_posting["required_skills"].lower().split(",")]
+
+
+def _score_bound(matched, required_count):
+    """Highest match score a candidate listing `matched` required skills can reach"""
+    skill_match_percentage = matched / required_count if required_count else 0
+    return skill_match_percentage * 50 + 25 + 25
+
+
+def search_candidates(job_posting, top_k=DEFAULT_TOP_K, db=None):
+    """Return the top_k candidates for a job posting, best match first
+
+    Each result is the candidate's analysis (with filename and user_id)
+    plus the match_score and match_details from match_resume_to_job.
+    Among equal scores, candidates with more required skills and then
+    newer analyses come first.
+    """
+    if top_k <= 0:
+        return []
+    db = db or DatabaseManager()
+
+    required_skills = _required_skills(job_posting)
+    skill_counts = db.count_skill_matches(required_skills)
+
+    levels = {}
+    for analysis_id, matched in skill_counts.items():
+        levels.setdefault(matched, []).append(analysis_id)
+
+    best = []  # min-heap of (score, -rank, candidate); rank is the order candidates were scored in
+    scored = 0
+
+    def settled(bound):
+        return len(best) >= top_k and best[0][0] >= bound
+
+    def consider(analysis):
+        nonlocal scored
+        result = match_resume_to_job(analysis, job_posting)
+        entry = (result["match_score"], -scored, {**analysis, **result})
+        scored += 1
+        if len(best) < top_k:
+            heapq.heappush(best, entry)
+        elif entry[:2] > best[0][:2]:
+            heapq.heapreplace(best, entry)
+
+    def scan():
+        for matched in sorted(levels, reverse=True):
+            bound = _score_bound(matched, len(required_skills))
+            analysis_ids = sorted(levels[matched], reverse=True)
+            for start in range(0, len(analysis_ids), SCORE_BATCH_SIZE):
+                if settled(bound):
+                    return
+                chunk = analysis_ids[start:start + SCORE_BATCH_SIZE]
+                analyses = db.get_candidate_analyses(chunk)
+                for analysis_id in chunk:
+                    if analysis_id in analyses:
+                        consider(analyses[analysis_id])
+
+        # Candidates without any of the required skills
+        bound = _score_bound(0, len(required_skills))
+        if settled(bound):
+            return
+        for batch in db.iter_latest_analyses(SCORE_BATCH_SIZE):
+            for analysis in batch:
+                if analysis["id"] not in skill_counts:
+                    consider(analysis)
+            if settled(bound):
+                return
+
+    scan()
+    return [candidate for _, _, candidate in sorted(best, key=lambda entry: entry[:2], reverse=True)]
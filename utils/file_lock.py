@@ -0,0 +1,64 @@
+"""
+Exclusive locks shared across processes.
+
+The lock is taken on a file that is never deleted (fcntl.flock, or
+msvcrt.locking on Windows), so the OS releases it when the holder closes
+the file or dies and there is never a stale lock to break.
+"""
+import contextlib
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Delay between attempts of a blocking lock on Windows
+RETRY_INTERVAL = 0.05
+
+
+def _try_lock(lock_file):
+    """Take the lock without waiting; returns False if another holder has it"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(lock_file):
+    if fcntl is not None:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def file_lock(lock_path, blocking=True):
+    """Hold an exclusive lock on lock_path for the duration of the block
+
+    Yields True once the lock is held. With blocking=False it yields False
+    right away, without the lock, if another holder has it.
+    """
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    with open(lock_path, 'a+b') as lock_file:
+        if blocking and fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        elif blocking:
+            while not _try_lock(lock_file):
+                time.sleep(RETRY_INTERVAL)
+        elif not _try_lock(lock_file):
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            _unlock(lock_file)
@@ -0,0 +1,137 @@
+"""
+Keeps resume_job_matches up to date in the background.
+
+Once started, every analysis saved through DatabaseManager is scored
+against all job postings, and every new job posting against the latest
+analysis of every resume, on a single background thread. Pages then read
+stored matches instead of matching on each render.
+
+To score everything already in the database (e.g. after an upgrade):
+
+    python -m utils.incremental_matcher
+"""
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from database.connection import DEFAULT_DB_PATH
+from database.db_manager import (ANALYSIS_SAVED, JOB_POSTED, DatabaseManager,
+                                 register_change_listener, unregister_change_listener)
+from utils.job_matcher import get_job_matcher
+from utils.resume_parser import match_resume_to_job
+
+# Analyses read from the database per round trip when scoring a new job
+BATCH_SIZE = 500
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def match_missing_jobs(analysis, db, jobs=None):
+    """Score an analysis against the jobs it has no current match for, and store the results"""
+    if jobs is None:
+        jobs = db.get_all_jobs()
+    if not jobs:
+        return 0
+
+    current_job_ids = db.get_current_match_job_ids(analysis["resume_id"], analysis["id"])
+    missing = [index for index, job in enumerate(jobs) if job["id"] not in current_job_ids]
+    if not missing:
+        return 0
+
+    job_matches = get_job_matcher(jobs).match(analysis)
+    db.save_resume_job_matches(analysis["resume_id"], analysis["id"], [
+        (jobs[index]["id"], job_matches.match_score(index), job_matches.match_details(index))
+        for index in missing
+    ])
+    return len(missing)
+
+
+def match_analyses(analysis_ids, db_path=DEFAULT_DB_PATH):
+    """Score analyses against every job posting and store the results"""
+    db = DatabaseManager(db_path)
+    jobs = db.get_all_jobs()
+    if not jobs:
+        return
+
+    for analysis in db.get_candidate_analyses(analysis_ids).values():
+        match_missing_jobs(analysis, db, jobs)
+
+
+def match_job(job_id, db_path=DEFAULT_DB_PATH):
+    """Score a job posting against the latest analysis of every resume and store the results"""
+    db = DatabaseManager(db_path)
+    job = db.get_job_posting(job_id)
+    if job is None:
+        return
+
+    for batch in db.iter_latest_analyses(BATCH_SIZE):
+        matches = []
+        for analysis in batch:
+            match_result = match_resume_to_job(analysis, job)
+            matches.append((analysis["resume_id"], analysis["id"],
+                            match_result["match_score"], match_result["match_details"]))
+        db.save_job_matches(job_id, matches)
+
+
+def rematch_all(db_path=DEFAULT_DB_PATH):
+    """Fill in every missing or outdated match; returns the number of matches written"""
+    db = DatabaseManager(db_path)
+    jobs = db.get_all_jobs()
+    written = 0
+    for batch in db.iter_latest_analyses(BATCH_SIZE):
+        for analysis in batch:
+            written += match_missing_jobs(analysis, db, jobs)
+    return written
+
+
+def _run(func, *args):
+    try:
+        func(*args)
+    except Exception as e:
+        print(f"Error updating job matches: {e}")
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # One worker keeps match writes in order and off the page threads
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="match-updater")
+        return _executor
+
+
+def _on_change(event, db_path, record_ids):
+    if event == ANALYSIS_SAVED:
+        _get_executor().submit(_run, match_analyses, record_ids, db_path)
+    elif event == JOB_POSTED:
+        for job_id in record_ids:
+            _get_executor().submit(_run, match_job, job_id, db_path)
+
+
+def start_incremental_matching():
+    """Start scoring new analyses and job postings in the background (idempotent)"""
+    register_change_listener(_on_change)
+
+
+def stop_incremental_matching(wait=True):
+    """Stop listening for changes and shut the background worker down"""
+    global _executor
+    unregister_change_listener(_on_change)
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every stored resume against every job posting.")
+    parser.add_argument("--db-path", default=DEFAULT_DB_PATH, help="SQLite database to update")
+    args = parser.parse_args()
+
+    written = rematch_all(args.db_path)
+    print(f"Updated {written} resume-job matches")
+
+
+if __name__ == "__main__":
+    main()
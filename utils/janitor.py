@@ -0,0 +1,142 @@
+"""
+Cleanup of scratch directories.
+
+Each directory has a policy: files older than max_age are deleted, then
+the oldest remaining files until the directory holds at most max_bytes.
+Unreferenced upload blobs are garbage collected in the same pass.
+
+The app calls start_janitor() on every script run, but a pass runs at most
+once per JANITOR_INTERVAL in a process, on a background thread, and only
+while holding an exclusive lock on cache/janitor.lock, so concurrent
+sessions and processes never sweep the same directories at once. The lock
+file itself is never deleted; the lock is released by the OS when a pass
+ends or its process dies. To run a pass by hand:
+
+    python -m utils.janitor
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+
+from database.connection import DEFAULT_DB_PATH
+from utils import wordcloud_cache
+from utils.blob_store import collect_garbage
+from utils.file_lock import file_lock
+
+# max_age in seconds, max_bytes in bytes (None = no limit)
+CleanupPolicy = namedtuple('CleanupPolicy', ['directory', 'max_age', 'max_bytes'])
+
+DAY = 24 * 3600
+MB = 1024 * 1024
+
+DEFAULT_POLICIES = [
+    # Guest uploads of earlier versions
+    CleanupPolicy('temp', 1 * DAY, 100 * MB),
+    # Recruiter preview uploads of earlier versions
+    CleanupPolicy(os.path.join('uploads', 'temp'), 1 * DAY, 100 * MB),
+    # Word clouds rendered by generate_wordcloud's default output directory
+    CleanupPolicy(os.path.join('static', 'images'), 7 * DAY, 50 * MB),
+    CleanupPolicy(wordcloud_cache.WORDCLOUD_DIR, wordcloud_cache.MAX_AGE_SECONDS, wordcloud_cache.MAX_CACHE_BYTES),
+]
+
+# Seconds between passes in one process
+JANITOR_INTERVAL = 3600
+
+LOCK_PATH = os.path.join('cache', 'janitor.lock')
+
+_last_run = None
+_schedule_lock = threading.Lock()
+
+
+def sweep_directory(policy, now=None):
+    """Apply one policy to the files directly inside its directory; returns (files removed, bytes freed)"""
+    now = time.time() if now is None else now
+    try:
+        # Hidden files (e.g. .gitkeep) are never touched
+        entries = [entry for entry in os.scandir(policy.directory)
+                   if entry.is_file(follow_symlinks=False) and not entry.name.startswith('.')]
+    except FileNotFoundError:
+        return 0, 0
+
+    removed = freed = 0
+    files = []
+    total_bytes = 0
+    for entry in entries:
+        try:
+            stat = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        if policy.max_age is not None and now - stat.st_mtime > policy.max_age:
+            if _remove(entry.path):
+                removed += 1
+                freed += stat.st_size
+        else:
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+            total_bytes += stat.st_size
+
+    if policy.max_bytes is not None and total_bytes > policy.max_bytes:
+        files.sort()
+        for _, size, path in files:
+            if total_bytes <= policy.max_bytes:
+                break
+            if _remove(path):
+                removed += 1
+                freed += size
+            total_bytes -= size
+    return removed, freed
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        print(f"Error removing {path}: {e}")
+        return False
+
+
+def run_janitor(policies=None, db_path=DEFAULT_DB_PATH, lock_path=LOCK_PATH, collect_blobs=True):
+    """Run one cleanup pass now; returns (files removed, bytes freed), or None if another pass is running"""
+    with file_lock(lock_path, blocking=False) as acquired:
+        if not acquired:
+            return None
+
+        removed = freed = 0
+        try:
+            now = time.time()
+            for policy in DEFAULT_POLICIES if policies is None else policies:
+                files, size = sweep_directory(policy, now)
+                removed += files
+                freed += size
+            if collect_blobs:
+                files, size = collect_garbage(db_path)
+                removed += files
+                freed += size
+        except Exception as e:
+            print(f"Error during scratch file cleanup: {e}")
+    return removed, freed
+
+
+def start_janitor(interval=JANITOR_INTERVAL, **kwargs):
+    """Start a background cleanup pass if none ran in this process within interval seconds"""
+    global _last_run
+    with _schedule_lock:
+        now = time.monotonic()
+        if _last_run is not None and now - _last_run < interval:
+            return False
+        _last_run = now
+
+    threading.Thread(target=run_janitor, kwargs=kwargs, name="janitor", daemon=True).start()
+    return True
+
+
+if __name__ == "__main__":
+    result = run_janitor()
+    if result is None:
+        print("Another cleanup pass is running.")
+    else:
+        removed, freed = result
+        print(f"Removed {removed} files ({freed / MB:.1f} MB)")
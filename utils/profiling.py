@@ -0,0 +1,178 @@
+"""
+Per-stage timing for the resume analysis pipeline.
+
+A StageTimer records the wall time (and optionally the peak traced memory)
+of each named stage. Finished timings are handed to any registered metrics
+sinks: a log line, an in-process histogram, or a Prometheus text file for
+the node_exporter textfile collector.
+"""
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_sinks = []
+_sinks_lock = threading.Lock()
+
+
+class StageTimer:
+    """Collect wall time, and optionally peak allocations, per pipeline stage.
+
+    Allocation tracking uses tracemalloc, which is process-wide and slows
+    Python down noticeably, so it is off unless trace_allocations is set.
+    """
+
+    def __init__(self, trace_allocations=False):
+        self.timings = {}
+        self.allocations = {}
+        self.trace_allocations = trace_allocations
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block and record it under name"""
+        started_tracing = False
+        if self.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+            if self.trace_allocations:
+                peak = tracemalloc.get_traced_memory()[1]
+                self.allocations[name] = max(self.allocations.get(name, 0), peak - baseline)
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def add(self, name, seconds):
+        """Record a stage that was timed elsewhere (e.g. a share of a batched stage)"""
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def total(self):
+        return sum(self.timings.values())
+
+
+def register_metrics_sink(sink):
+    """Send every finished analysis timing to sink(timings, allocations)"""
+    with _sinks_lock:
+        if sink not in _sinks:
+            _sinks.append(sink)
+
+
+def unregister_metrics_sink(sink):
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def emit_timings(timer):
+    """Pass a finished timer's results to the registered sinks"""
+    with _sinks_lock:
+        sinks = list(_sinks)
+    for sink in sinks:
+        try:
+            sink(timer.timings, timer.allocations)
+        except Exception as e:
+            print(f"Error in metrics sink {sink!r}: {e}")
+
+
+class LogSink:
+    """Write one log line per analysis with the time spent in each stage"""
+
+    def __init__(self, log=logger, level=logging.INFO):
+        self.log = log
+        self.level = level
+
+    def __call__(self, timings, allocations):
+        stages = " ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in timings.items())
+        if allocations:
+            stages += " " + " ".join(f"{name}_peak={size / 1024:.0f}KiB" for name, size in allocations.items())
+        self.log.log(self.level, "analyze_resume total=%.1fms %s", sum(timings.values()) * 1000, stages)
+
+
+class HistogramSink:
+    """Keep cumulative per-stage latency histograms in memory"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def __call__(self, timings, allocations):
+        with self._lock:
+            for name, seconds in timings.items():
+                stage = self._stages.setdefault(name, {
+                    "counts": [0] * len(self.buckets), "count": 0, "sum": 0.0
+                })
+                for i, bound in enumerate(self.buckets):
+                    if seconds <= bound:
+                        stage["counts"][i] += 1
+                stage["count"] += 1
+                stage["sum"] += seconds
+
+    def snapshot(self):
+        """Return a copy of the histograms keyed by stage name"""
+        with self._lock:
+            return {
+                name: {"buckets": dict(zip(self.buckets, stage["counts"])),
+                       "count": stage["count"], "sum": stage["sum"]}
+                for name, stage in self._stages.items()
+            }
+
+
+class PrometheusTextfileSink(HistogramSink):
+    """Histogram sink that also rewrites a Prometheus text-format file.
+
+    The file is replaced atomically at most once every min_interval seconds,
+    so it can be scraped by node_exporter's textfile collector.
+    """
+
+    metric_name = "resumeiq_analysis_stage_seconds"
+
+    def __init__(self, path, buckets=DEFAULT_BUCKETS, min_interval=10.0):
+        super().__init__(buckets)
+        self.path = path
+        self.min_interval = min_interval
+        self._last_write = 0.0
+
+    def __call__(self, timings, allocations):
+        super().__call__(timings, allocations)
+        now = time.monotonic()
+        if now - self._last_write >= self.min_interval:
+            self._last_write = now
+            self.write()
+
+    def render(self):
+        lines = [
+            f"# HELP {self.metric_name} Time spent in each resume analysis stage.",
+            f"# TYPE {self.metric_name} histogram",
+        ]
+        for name, stage in sorted(self.snapshot().items()):
+            for bound, count in stage["buckets"].items():
+                lines.append(f'{self.metric_name}_bucket{{stage="{name}",le="{bound}"}} {count}')
+            lines.append(f'{self.metric_name}_bucket{{stage="{name}",le="+Inf"}} {stage["count"]}')
+            lines.append(f'{self.metric_name}_sum{{stage="{name}"}} {stage["sum"]}')
+            lines.append(f'{self.metric_name}_count{{stage="{name}"}} {stage["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(self.render())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error writing metrics file {self.path}: {e}")
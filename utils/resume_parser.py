@@ -1,53 +1,238 @@
+import contextlib
+import hashlib
+import io
 import os
 import re
-import spacy
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 import PyPDF2
 import docx2txt
-from wordcloud import WordCloud
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-import sqlite3
-
-# Load spaCy NLP model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print("Downloading spaCy model...")
-    os.system("python -m spacy download en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
-
-def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF file"""
-    text = ""
+
+from database.connection import DEFAULT_DB_PATH
+from database.db_manager import DatabaseManager
+from utils.analysis_cache import file_sha256, get_analysis_cache, make_cache_key
+from utils.profiling import StageTimer, emit_timings
+from utils.skill_taxonomy import get_taxonomy
+
+# Bump whenever extraction or scoring changes so cached analyses are not reused
+PARSER_VERSION = "4"
+
+# Extraction budget for PDFs; long CVs with publication lists are cut here
+PDF_MAX_PAGES = 20
+PDF_MAX_TEXT_BYTES = 200 * 1024
+
+# Worker processes for page-parallel PDF extraction (1 = extract in-line)
+PDF_WORKERS = 1
+
+# Documents shorter than this are never split across processes
+PDF_PARALLEL_MIN_PAGES = 8
+
+_pdf_page_pool = None
+_pdf_page_pool_workers = None
+_pdf_page_pool_lock = threading.Lock()
+
+SPACY_MODEL = "en_core_web_sm"
+
+# Pipeline components we never use. The small English model's NER has its own
+# internal tok2vec layer, so the shared tok2vec can be excluded as well.
+SPACY_EXCLUDE = ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer"]
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    """Load the spaCy model on first use, keeping only the NER component"""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                # Imported here so importing this module stays cheap
+                import spacy
+                try:
+                    _nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+                except OSError:
+                    raise RuntimeError(
+                        f"spaCy model '{SPACY_MODEL}' is not installed. "
+                        f"Install it with: python -m spacy download {SPACY_MODEL}"
+                    )
+    return _nlp
+
+# Number of texts handed to nlp.pipe at a time
+NER_BATCH_SIZE = 16
+
+# Entity labels fed into the education and experience extractors
+NER_LABELS = ('ORG', 'GPE', 'DATE')
+
+# Organisation or place names in this section count as education entries
+EDUCATION_SECTION_HEADER = re.compile(r'^\s*(?:education|academic|qualifications)\b')
+
+
+@contextlib.contextmanager
+def open_resume(source):
+    """Open a resume for binary reading
+    
+    source is a file path, a bytes-like buffer or a readable binary stream
+    (such as a Streamlit upload), so uploads can be parsed straight from
+    memory. Streams are rewound and left open.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            yield f
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    else:
+        source.seek(0)
+        yield source
+
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+def _source_name(source, filename=None):
+    """Name used to tell the file format of a resume source"""
+    if filename:
+        return filename
+    if _is_path(source):
+        return os.fspath(source)
+    return getattr(source, 'name', None) or ''
+
+def iter_pdf_pages(pdf_path, max_pages=None):
+    """Yield the text of each PDF page in order, reading pages only as they are consumed"""
+    with open_resume(pdf_path) as pdf_file:
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        page_count = len(pdf_reader.pages)
+        if max_pages is not None:
+            page_count = min(page_count, max_pages)
+        for page_num in range(page_count):
+            yield pdf_reader.pages[page_num].extract_text() or ""
+
+def _extract_pdf_page_range(pdf_path, start, stop):
+    """Extract a range of pages; runs in a worker process for parallel extraction"""
+    with open(pdf_path, 'rb') as pdf_file:
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        return [pdf_reader.pages[page_num].extract_text() or "" for page_num in range(start, stop)]
+
+def _get_pdf_page_pool(workers):
+    global _pdf_page_pool, _pdf_page_pool_workers
+    with _pdf_page_pool_lock:
+        if _pdf_page_pool is None or _pdf_page_pool_workers != workers:
+            if _pdf_page_pool is not None:
+                _pdf_page_pool.shutdown(wait=False)
+            _pdf_page_pool = ProcessPoolExecutor(max_workers=workers)
+            _pdf_page_pool_workers = workers
+        return _pdf_page_pool
+
+def _iter_pdf_pages_parallel(pdf_path, max_pages, workers):
+    """Yield page text in order while page ranges are extracted in worker processes"""
+    with open(pdf_path, 'rb') as pdf_file:
+        page_count = len(PyPDF2.PdfReader(pdf_file).pages)
+    if max_pages is not None:
+        page_count = min(page_count, max_pages)
+    
+    if page_count < PDF_PARALLEL_MIN_PAGES:
+        yield from iter_pdf_pages(pdf_path, max_pages)
+        return
+    
+    pool = _get_pdf_page_pool(workers)
+    chunk = -(-page_count // workers)
+    futures = [pool.submit(_extract_pdf_page_range, pdf_path, start, min(start + chunk, page_count))
+               for start in range(0, page_count, chunk)]
     try:
-        with open(pdf_path, 'rb') as pdf_file:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            for page_num in range(len(pdf_reader.pages)):
-                text += pdf_reader.pages[page_num].extract_text()
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+def _resolve_pdf_limits(max_pages=None, max_bytes=None):
+    """Apply the PDF_MAX_* defaults to unset limits; 0 means no limit and comes back as None"""
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages or None
+    max_bytes = PDF_MAX_TEXT_BYTES if max_bytes is None else max_bytes or None
+    return max_pages, max_bytes
+
+def _pdf_page_count(pdf_path):
+    with open_resume(pdf_path) as pdf_file:
+        return len(PyPDF2.PdfReader(pdf_file).pages)
+
+def _extract_pdf(pdf_path, max_pages=None, max_bytes=None, workers=None):
+    """extract_text_from_pdf, also returning whether a limit cut the text short"""
+    max_pages, max_bytes = _resolve_pdf_limits(max_pages, max_bytes)
+    workers = PDF_WORKERS if workers is None else workers
+    
+    parts = []
+    total_bytes = 0
+    page_total = 0
+    truncated = False
+    try:
+        if workers > 1 and _is_path(pdf_path):
+            pages = _iter_pdf_pages_parallel(pdf_path, max_pages, workers)
+        else:
+            pages = iter_pdf_pages(pdf_path, max_pages)
+        
+        for page_text in pages:
+            page_total += 1
+            if max_bytes is not None:
+                encoded = page_text.encode('utf-8')
+                if total_bytes + len(encoded) > max_bytes:
+                    remaining = encoded[:max_bytes - total_bytes]
+                    parts.append(remaining.decode('utf-8', errors='ignore'))
+                    pages.close()
+                    truncated = True
+                    break
+                total_bytes += len(encoded)
+            parts.append(page_text)
+        else:
+            # Pages past the limit were never read; only count them
+            if max_pages is not None and page_total == max_pages:
+                truncated = _pdf_page_count(pdf_path) > max_pages
     except Exception as e:
         print(f"Error extracting text from PDF: {e}")
-    return text
+    
+    if truncated:
+        print(f"PDF text truncated to the first {page_total} pages (limits: {max_pages} pages, {max_bytes} bytes)")
+    return "".join(parts), truncated
+
+def extract_text_from_pdf(pdf_path, max_pages=None, max_bytes=None, workers=None):
+    """Extract text from PDF file (a path or an in-memory buffer, see open_resume)
+    
+    Pages are streamed and joined once at the end. Extraction stops after
+    max_pages pages or once max_bytes of UTF-8 text have been collected
+    (defaults: PDF_MAX_PAGES and PDF_MAX_TEXT_BYTES; pass 0 for no limit);
+    a cut is logged, and analyze_resume reports it as "truncated".
+    With workers > 1, long documents are split into page ranges that are
+    extracted in parallel processes (file paths only).
+    """
+    return _extract_pdf(pdf_path, max_pages, max_bytes, workers)[0]
 
 def extract_text_from_docx(docx_path):
-    """Extract text from DOCX file"""
+    """Extract text from DOCX file (a path or an in-memory buffer, see open_resume)"""
     try:
-        text = docx2txt.process(docx_path)
+        with open_resume(docx_path) as docx_file:
+            text = docx2txt.process(docx_file)
         return text
     except Exception as e:
         print(f"Error extracting text from DOCX: {e}")
         return ""
 
-def extract_text(file_path):
-    """Extract text from uploaded resume file"""
-    file_extension = os.path.splitext(file_path)[1].lower()
+def extract_text(file_path, filename=None, max_pages=None, max_bytes=None, workers=None):
+    """Extract text from uploaded resume file
+    
+    file_path may also be an in-memory upload (see open_resume); the format
+    is taken from filename, or else from the upload's name attribute.
+    max_pages, max_bytes and workers apply to PDFs (see extract_text_from_pdf).
+    """
+    return _extract_text(file_path, filename, max_pages, max_bytes, workers)[0]
+
+def _extract_text(file_path, filename=None, max_pages=None, max_bytes=None, workers=None):
+    """extract_text, also returning whether a PDF limit cut the text short"""
+    file_extension = os.path.splitext(_source_name(file_path, filename))[1].lower()
     
     if file_extension == '.pdf':
-        return extract_text_from_pdf(file_path)
+        return _extract_pdf(file_path, max_pages, max_bytes, workers)
     elif file_extension == '.docx':
-        return extract_text_from_docx(file_path)
+        return extract_text_from_docx(file_path), False
     else:
-        return ""
+        return "", False
 
 def preprocess_text(text):
     """Clean and preprocess the extracted text"""
@@ -62,10 +247,8 @@ def preprocess_text(text):
     
     return text.strip()
 
-def extract_entities(text):
-    """Extract entities (skills, education, experience, etc.) using spaCy NER"""
-    doc = nlp(text)
-    
+def _entities_from_doc(doc):
+    """Group the entities of a processed spaCy doc by label"""
     entities = {
         'PERSON': [],
         'ORG': [],
@@ -80,60 +263,44 @@ def extract_entities(text):
     
     return entities
 
+def extract_entities(text):
+    """Extract entities (skills, education, experience, etc.) using spaCy NER"""
+    return _entities_from_doc(get_nlp()(text))
+
+def extract_entities_batch(texts, batch_size=NER_BATCH_SIZE, n_process=1):
+    """Extract entities from many texts with nlp.pipe, running only the NER component"""
+    nlp = get_nlp()
+    docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+    return [_entities_from_doc(doc) for doc in docs]
+
 def extract_skills(text):
-    """Extract skills from resume text using a predefined skill list"""
-    # Common technical skills list
-    skills_list = [
-        # Programming Languages
-        "python", "java", "javascript", "c++", "c#", "ruby", "php", "swift", "kotlin", "golang",
-        "typescript", "scala", "perl", "r", "matlab", "bash", "shell", "sql", "html", "css",
-        
-        # Frameworks & Libraries
-        "react", "angular", "vue", "django", "flask", "spring", "express", "node.js", "tensorflow",
-        "pytorch", "keras", "scikit-learn", "pandas", "numpy", "matplotlib", "bootstrap", "jquery",
-        
-        # Databases
-        "mysql", "postgresql", "mongodb", "oracle", "sql server", "sqlite", "redis", "cassandra",
-        "dynamodb", "firebase",
-        
-        # Cloud Platforms
-        "aws", "azure", "google cloud", "gcp", "heroku", "digitalocean", "kubernetes", "docker",
-        
-        # Tools & Software
-        "git", "jenkins", "jira", "confluence", "tableau", "power bi", "excel", "photoshop",
-        "illustrator", "figma", "sketch", "invision",
-        
-        # Methodologies
-        "agile", "scrum", "kanban", "waterfall", "devops", "ci/cd", "test-driven development", "tdd",
-        
-        # Soft Skills
-        "communication", "teamwork", "leadership", "problem-solving", "critical thinking",
-        "time management", "creativity", "adaptability", "emotional intelligence"
-    ]
-    
-    found_skills = []
-    processed_text = text.lower()
-    
-    for skill in skills_list:
-        if re.search(r'\b' + re.escape(skill) + r'\b', processed_text):
-            found_skills.append(skill)
-    
-    return found_skills
+    """Extract skills from resume text using the skill taxonomy"""
+    return get_taxonomy().extract_skills(text)
 
-def extract_education(text):
-    """Extract education information from resume"""
-    education_keywords = [
-        "bachelor", "master", "phd", "doctorate", "diploma", "certificate", 
-        "degree", "b.tech", "m.tech", "b.e.", "m.e.", "b.sc", "m.sc",
-        "b.a.", "m.a.", "mba", "bba", "college", "university", "institute",
-        "school of", "academy"
-    ]
+def extract_education(text, entities=None):
+    """Extract education information from resume
+    
+    When NER entities are given, lines of the education section that mention
+    an organisation or place are also kept, even without a degree keyword.
+    """
+    education_keywords = get_taxonomy().education_keywords
+    institutions = []
+    if entities:
+        institutions = [name.lower() for name in entities.get('ORG', []) + entities.get('GPE', [])]
     
     education_info = []
     lines = text.lower().split('\n')
+    in_education_section = False
     
     for i, line in enumerate(lines):
-        if any(keyword in line for keyword in education_keywords):
+        if institutions:
+            if EDUCATION_SECTION_HEADER.match(line):
+                in_education_section = True
+            elif not line.strip():
+                in_education_section = False
+        
+        if (any(keyword in line for keyword in education_keywords)
+                or (in_education_section and any(name in line for name in institutions))):
             # Get the current line and potentially the next line for more context
             edu_text = line
             if i + 1 < len(lines):
@@ -142,8 +309,12 @@ def extract_education(text):
     
     return education_info
 
-def extract_experience(text):
-    """Extract work experience from resume"""
+def extract_experience(text, entities=None):
+    """Extract work experience from resume
+    
+    When NER entities are given, DATE entities the date patterns miss
+    (e.g. "Summer 2019") are used as extra anchors for experience items.
+    """
     # Look for common experience section headers
     experience_sections = re.findall(
         r'(?:work|professional|employment)(?:\s+experience|\s+history)?.*?(?=\n\s*\n|$)', 
@@ -157,6 +328,13 @@ def extract_experience(text):
     # Extract experience items (looking for dates, position titles, company names)
     experience_items = []
     
+    # Only dates that mention a year are useful anchors
+    entity_dates = []
+    if entities:
+        entity_dates = list(dict.fromkeys(
+            date.lower() for date in entities.get('DATE', []) if re.search(r'\d{4}', date)
+        ))
+    
     for section in experience_sections:
         # Look for dates with various formats (MM/YYYY, Month YYYY, YYYY-YYYY)
         date_patterns = [
@@ -166,20 +344,37 @@ def extract_experience(text):
             r'\b\d{4}\s*to\s*(?:\d{4}|present|current)\b'
         ]
         
+        date_spans = []
         for pattern in date_patterns:
             matches = re.finditer(pattern, section, re.IGNORECASE)
             for match in matches:
                 start_pos = match.start()
+                date_spans.append(match.span())
                 # Get context around the date (likely job details)
                 context_start = max(0, start_pos - 100)
                 context_end = min(len(section), start_pos + 200)
                 context = section[context_start:context_end]
                 experience_items.append(context.strip())
+        
+        for date in entity_dates:
+            start_pos = section.find(date)
+            while start_pos != -1:
+                end_pos = start_pos + len(date)
+                # Skip dates the patterns above already anchored on
+                if not any(start < end_pos and start_pos < end for start, end in date_spans):
+                    date_spans.append((start_pos, end_pos))
+                    context_start = max(0, start_pos - 100)
+                    context_end = min(len(section), start_pos + 200)
+                    experience_items.append(section[context_start:context_end].strip())
+                start_pos = section.find(date, end_pos)
     
     return experience_items
 
-def generate_wordcloud(text, file_name="wordcloud.png"):
+def generate_wordcloud(text, file_name="wordcloud.png", output_dir='static/images'):
     """Generate word cloud from resume text"""
+    # Imported here because wordcloud pulls in matplotlib, which is slow to import
+    from wordcloud import WordCloud
+    
     processed_text = preprocess_text(text)
     
     # Create and generate a word cloud image
@@ -188,7 +383,7 @@ def generate_wordcloud(text, file_name="wordcloud.png"):
                          min_font_size=10).generate(processed_text)
     
     # Save the image
-    save_path = os.path.join('static/images', file_name)
+    save_path = os.path.join(output_dir, file_name)
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
     wordcloud.to_file(save_path)
     
@@ -244,33 +439,21 @@ def get_improvement_suggestions(skills, education, experience, score):
     
     return suggestions
 
-def save_analysis_to_db(resume_id, skills, education, experience, score, feedback):
+def save_analysis_to_db(resume_id, skills, education, experience, score, feedback, db_path=DEFAULT_DB_PATH):
     """Save analysis results to database"""
-    conn = sqlite3.connect('database/resume_analyzer.db')
-    cursor = conn.cursor()
-    
-    # Convert lists to strings for storage
-    skills_str = ", ".join(skills)
-    education_str = ", ".join(education)
-    experience_str = ", ".join(experience)
-    feedback_str = ", ".join(feedback)
-    
-    cursor.execute('''
-    INSERT INTO analysis_results 
-    (resume_id, skills, education, experience, score, feedback)
-    VALUES (?, ?, ?, ?, ?, ?)
-    ''', (resume_id, skills_str, education_str, experience_str, score, feedback_str))
-    
-    conn.commit()
-    analysis_id = cursor.lastrowid
-    conn.close()
-    
-    return analysis_id
-
-def analyze_resume(file_path, resume_id=None):
-    """Main function to analyze a resume file"""
-    # Extract text from resume
-    text = extract_text(file_path)
+    return DatabaseManager(db_path).save_analysis(resume_id, skills, education, experience, score, feedback)
+
+def analysis_version(use_ner=False, max_pages=None, max_bytes=None):
+    """Version tag for cached analyses: parser logic, the skill taxonomy in use and non-default PDF limits"""
+    version = f"{PARSER_VERSION}-{get_taxonomy().version[:16]}"
+    limits = _resolve_pdf_limits(max_pages, max_bytes)
+    if limits != _resolve_pdf_limits():
+        version = f"{version}-p{limits[0]}-b{limits[1]}"
+    return f"{version}-ner" if use_ner else version
+
+def _analysis_from_text(text, content_hash, entities=None, timer=None, progress=None, truncated=False):
+    """Run every extractor on extracted resume text and build the analysis dict"""
+    timer = timer or StageTimer()
     if not text:
         return {
             "status": "error",
@@ -278,34 +461,167 @@ def analyze_resume(file_path, resume_id=None):
         }
     
     # Extract information
-    skills = extract_skills(text)
-    education = extract_education(text)
-    experience = extract_experience(text)
-    
-    # Calculate score
-    score = calculate_resume_score(skills, education, experience)
-    
-    # Get improvement suggestions
-    suggestions = get_improvement_suggestions(skills, education, experience, score)
-    
-    # Generate word cloud
-    wordcloud_path = generate_wordcloud(text, f"wordcloud_{os.path.basename(file_path)}.png")
-    
-    # Save to database if resume_id provided
-    if resume_id:
-        save_analysis_to_db(resume_id, skills, education, experience, score, suggestions)
+    with timer.stage("extract_skills"):
+        skills = extract_skills(text)
+    _report_progress(progress, "extract_skills", skills=skills)
+    with timer.stage("extract_education"):
+        education = extract_education(text, entities)
+    _report_progress(progress, "extract_education", skills=skills, education=education)
+    with timer.stage("extract_experience"):
+        experience = extract_experience(text, entities)
+    _report_progress(progress, "extract_experience", skills=skills, education=education, experience=experience)
+    
+    with timer.stage("scoring"):
+        # Calculate score
+        score = calculate_resume_score(skills, education, experience)
+        
+        # Get improvement suggestions
+        suggestions = get_improvement_suggestions(skills, education, experience, score)
     
     # Return analysis results
-    return {
+    analysis = {
         "status": "success",
         "text_length": len(text),
+        # True when a PDF page or text limit cut the text short
+        "truncated": truncated,
         "skills": skills,
         "education": education,
         "experience": experience,
         "score": score,
         "suggestions": suggestions,
-        "wordcloud_path": wordcloud_path
+        # Identifies the file contents, e.g. for rendering its word cloud on demand
+        "content_hash": content_hash
     }
+    if entities is not None:
+        analysis["entities"] = {label: entities.get(label, []) for label in NER_LABELS}
+    return analysis
+
+def _report_progress(progress, stage, **partial):
+    """Tell an optional progress callback which stage finished and the results so far"""
+    if progress is not None:
+        progress(stage, partial)
+
+def _content_hash(source):
+    if _is_path(source):
+        return file_sha256(source) if os.path.isfile(source) else None
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    if hasattr(source, 'getbuffer'):
+        # Hash a BytesIO upload in place, without copying it
+        with source.getbuffer() as view:
+            return hashlib.sha256(view).hexdigest()
+    digest = hashlib.sha256()
+    with open_resume(source) as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _save_analysis(resume_id, analysis):
+    return save_analysis_to_db(resume_id, analysis["skills"], analysis["education"],
+                               analysis["experience"], analysis["score"], analysis["suggestions"])
+
+def _with_timings(analysis, timer):
+    """Attach a timer's results to a copy of the analysis and report them to the metrics sinks"""
+    analysis = dict(analysis, timings=dict(timer.timings))
+    if timer.trace_allocations:
+        analysis["allocations"] = dict(timer.allocations)
+    emit_timings(timer)
+    return analysis
+
+def analyze_resume(file_path, resume_id=None, use_cache=True, use_ner=False, trace_allocations=False,
+                   progress=None, filename=None, content_hash=None, max_pages=None, max_bytes=None, workers=None):
+    """Main function to analyze a resume file
+    
+    use_ner adds a spaCy NER stage whose ORG, GPE and DATE entities feed the
+    education and experience extractors. The returned dict carries the wall
+    time of each stage under "timings" (and peak allocations under
+    "allocations" when trace_allocations is set). progress, if given, is
+    called as progress(stage, partial_results) after each extraction stage.
+    file_path may also be an in-memory upload, parsed without touching the
+    disk (see extract_text for how filename is used). content_hash, the
+    file's SHA-256 if the caller already computed it, is used as the cache
+    key instead of hashing the file again. max_pages, max_bytes and workers
+    are passed to extract_text; "truncated" in the result tells whether the
+    limits cut the text short.
+    """
+    timer = StageTimer(trace_allocations)
+    analysis = None
+    cache_key = None
+    
+    if content_hash is None:
+        with timer.stage("hash_file"):
+            content_hash = _content_hash(file_path)
+    
+    # Reuse a previous analysis of the same file contents if one is cached
+    if use_cache and content_hash:
+        with timer.stage("cache_lookup"):
+            cache_key = make_cache_key(content_hash, analysis_version(use_ner, max_pages, max_bytes))
+            analysis = get_analysis_cache().get(cache_key)
+    
+    if analysis is None:
+        with timer.stage("extract_text"):
+            text, truncated = _extract_text(file_path, filename, max_pages, max_bytes, workers)
+        _report_progress(progress, "extract_text", text_length=len(text or ""), truncated=truncated)
+        entities = None
+        if use_ner and text:
+            with timer.stage("extract_entities"):
+                entities = extract_entities(text)
+        analysis = _analysis_from_text(text, content_hash, entities, timer, progress, truncated)
+        if cache_key and analysis["status"] == "success":
+            with timer.stage("cache_store"):
+                get_analysis_cache().put(cache_key, analysis)
+    
+    # Save to database if resume_id provided
+    if resume_id and analysis["status"] == "success":
+        with timer.stage("save_analysis_to_db"):
+            _save_analysis(resume_id, analysis)
+    
+    return _with_timings(analysis, timer)
+
+def analyze_resume_batch(file_paths, use_cache=True, use_ner=True, batch_size=NER_BATCH_SIZE, n_process=1):
+    """Analyze several resume files, running NER over all of them with one nlp.pipe call
+    
+    Returns the analyses in the same order as file_paths. Nothing is saved to
+    the database; callers store the results themselves. The batched NER time
+    is split evenly across the resumes it covered.
+    """
+    analyses = [None] * len(file_paths)
+    content_hashes = [None] * len(file_paths)
+    cache_keys = [None] * len(file_paths)
+    timers = [StageTimer() for _ in file_paths]
+    texts = {}
+    truncated = {}
+    
+    for i, file_path in enumerate(file_paths):
+        with timers[i].stage("hash_file"):
+            content_hashes[i] = _content_hash(file_path)
+        if use_cache and content_hashes[i]:
+            with timers[i].stage("cache_lookup"):
+                cache_keys[i] = make_cache_key(content_hashes[i], analysis_version(use_ner))
+                analyses[i] = get_analysis_cache().get(cache_keys[i])
+        if analyses[i] is None:
+            with timers[i].stage("extract_text"):
+                texts[i], truncated[i] = _extract_text(file_path)
+    
+    # Entities for every resume that still needs analysing, in one batched pass
+    pending = [i for i, text in texts.items() if text]
+    entities = {}
+    if use_ner and pending:
+        start = time.perf_counter()
+        batch = extract_entities_batch([texts[i] for i in pending], batch_size=batch_size, n_process=n_process)
+        entities = dict(zip(pending, batch))
+        share = (time.perf_counter() - start) / len(pending)
+        for i in pending:
+            timers[i].add("extract_entities", share)
+    
+    for i, text in texts.items():
+        analyses[i] = _analysis_from_text(text, content_hashes[i], entities.get(i), timers[i],
+                                          truncated=truncated[i])
+        if cache_keys[i] and analyses[i]["status"] == "success":
+            with timers[i].stage("cache_store"):
+                get_analysis_cache().put(cache_keys[i], analyses[i])
+    
+    return [_with_timings(analysis, timer) for analysis, timer in zip(analyses, timers)]
 
 def match_resume_to_job(resume_analysis, job_posting):
     """Match a resume to a job posting and calculate match score"""
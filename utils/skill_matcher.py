@@ -0,0 +1,117 @@
+"""
+Single-pass skill matching for resume text.
+
+All skill terms are folded into one trie-shaped regular expression, so a
+resume is scanned once no matter how many skills are in the catalogue.
+"""
+import re
+
+_WORD_CHAR = re.compile(r'\w')
+
+
+def _is_word_char(char):
+    return bool(_WORD_CHAR.match(char))
+
+
+def _build_trie(terms):
+    """Build a character trie; the empty-string key marks the end of a term"""
+    root = {}
+    for term in terms:
+        node = root
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = True
+    return root
+
+
+def _trie_to_regex(node):
+    """Turn a trie node into a regex fragment that prefers the longest term"""
+    is_terminal = '' in node
+    branches = [re.escape(char) + _trie_to_regex(child)
+                for char, child in sorted(node.items()) if char]
+
+    if not branches:
+        return ''
+    if len(branches) == 1 and not is_terminal:
+        return branches[0]
+
+    fragment = '(?:' + '|'.join(branches) + ')'
+    # A greedy optional group tries the longer term first and backtracks to
+    # the shorter one when the trailing word boundary does not hold
+    return fragment + '?' if is_terminal else fragment
+
+
+def _prefix_terms(terms):
+    """Map each term to the shorter terms that match wherever it matches.
+
+    A term P is implied by a longer term T when T starts with P and there is a
+    word boundary inside T right after P (e.g. "sql" inside "sql server").
+    """
+    term_set = set(terms)
+    prefixes = {}
+    for term in terms:
+        implied = []
+        for end in range(1, len(term)):
+            prefix = term[:end]
+            if prefix in term_set and _is_word_char(term[end - 1]) != _is_word_char(term[end]):
+                implied.append(prefix)
+        if implied:
+            prefixes[term] = tuple(implied)
+    return prefixes
+
+
+class SkillMatcher:
+    """Find every catalogue term in a text with one regex scan.
+
+    Matching follows the same rules as searching for each term separately
+    with ``\\b<term>\\b`` in the lowercased text, and results come back in
+    catalogue order. Aliases (synonyms) are matched like any other term but
+    reported under the skill they belong to.
+    """
+
+    def __init__(self, terms, aliases=None, _compiled=None):
+        # Drop duplicates but keep the catalogue order
+        self.terms = list(dict.fromkeys(terms))
+        self.aliases = dict(aliases or {})
+        self._order = {term: index for index, term in enumerate(self.terms)}
+
+        if _compiled is not None:
+            pattern_source, self._prefixes = _compiled
+        else:
+            all_terms = self.terms + [alias for alias in self.aliases if alias not in self._order]
+            self._prefixes = _prefix_terms(all_terms)
+            # The lookahead keeps matches zero-width so overlapping terms
+            # starting at later positions are still found
+            pattern_source = r'(?=\b(' + _trie_to_regex(_build_trie(all_terms)) + r')\b)' if all_terms else None
+
+        self.pattern_source = pattern_source
+        self.pattern = re.compile(pattern_source) if pattern_source else None
+
+    def to_dict(self):
+        """Serialize the built matcher so it can be cached on disk"""
+        return {
+            "terms": self.terms,
+            "aliases": self.aliases,
+            "pattern": self.pattern_source,
+            "prefixes": {term: list(implied) for term, implied in self._prefixes.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore a matcher saved with to_dict without rebuilding the trie"""
+        prefixes = {term: tuple(implied) for term, implied in data["prefixes"].items()}
+        return cls(data["terms"], data["aliases"], _compiled=(data["pattern"], prefixes))
+
+    def find_all(self, text):
+        """Return all terms found in the text, in catalogue order"""
+        if self.pattern is None:
+            return []
+
+        found = set()
+        for match in self.pattern.finditer(text.lower()):
+            term = match.group(1)
+            found.add(term)
+            found.update(self._prefixes.get(term, ()))
+
+        skills = {self.aliases.get(term, term) for term in found}
+        return sorted(skills, key=self._order.__getitem__)
@@ -0,0 +1,146 @@
+"""
+Skill taxonomy shared by the parser and the UI.
+
+Skills, their synonyms and categories, and the education keywords are read
+from a JSON data file. The compiled skill matcher is cached on disk under a
+name derived from the file's SHA-256, so it is only rebuilt when the
+taxonomy file changes.
+"""
+import json
+import os
+import threading
+
+from utils.analysis_cache import file_sha256
+from utils.skill_matcher import SkillMatcher
+
+DEFAULT_TAXONOMY_PATH = os.path.join('data', 'skill_taxonomy.json')
+INDEX_CACHE_DIR = os.path.join('cache', 'taxonomy')
+
+# Bump when the serialized matcher layout changes so stale indexes are ignored
+INDEX_FORMAT_VERSION = 1
+
+DEFAULT_CATEGORY = "Other"
+
+_default_taxonomy = None
+_default_lock = threading.Lock()
+
+
+class SkillTaxonomy:
+    """Skill vocabulary with O(1) category lookup and a single-pass matcher"""
+
+    def __init__(self, skills, categories, category_names, synonyms, education_keywords,
+                 version, matcher=None):
+        self.skills = skills
+        self.categories = categories
+        self.category_names = category_names
+        self.synonyms = synonyms
+        self.education_keywords = education_keywords
+        self.version = version
+        self.matcher = matcher or SkillMatcher(skills, synonyms)
+
+    def extract_skills(self, text):
+        """Return the canonical skills mentioned in the text"""
+        return self.matcher.find_all(text)
+
+    def category_of(self, skill):
+        """Return the category of a skill, or the default category"""
+        return self.categories.get(skill.lower(), DEFAULT_CATEGORY)
+
+    def group_by_category(self, skills):
+        """Group skills by category, keeping the taxonomy's category order"""
+        groups = {name: [] for name in self.category_names}
+        for skill in skills:
+            groups.setdefault(self.category_of(skill), []).append(skill)
+        return groups
+
+
+def _parse_taxonomy(data):
+    """Turn the raw JSON document into skill, category and synonym tables"""
+    skills = []
+    categories = {}
+    synonyms = {}
+
+    for entry in data.get("skills", []):
+        if isinstance(entry, str):
+            entry = {"name": entry}
+        name = entry["name"].strip().lower()
+        if not name or name in categories:
+            continue
+        skills.append(name)
+        categories[name] = entry.get("category") or DEFAULT_CATEGORY
+
+    for entry in data.get("skills", []):
+        if isinstance(entry, str):
+            continue
+        name = entry["name"].strip().lower()
+        for synonym in entry.get("synonyms", []):
+            synonym = synonym.strip().lower()
+            # A synonym may not shadow another canonical skill
+            if synonym and synonym not in categories:
+                synonyms.setdefault(synonym, name)
+
+    category_names = list(data.get("categories", []))
+    for category in list(categories.values()) + [DEFAULT_CATEGORY]:
+        if category not in category_names:
+            category_names.append(category)
+
+    education_keywords = [keyword.lower() for keyword in data.get("education_keywords", [])]
+
+    return skills, categories, category_names, synonyms, education_keywords
+
+
+def _index_path(cache_dir, version):
+    return os.path.join(cache_dir, f"skills_{version}_v{INDEX_FORMAT_VERSION}.json")
+
+
+def _load_cached_matcher(cache_dir, version):
+    path = _index_path(cache_dir, version)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            return SkillMatcher.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring unreadable skill index {path}: {e}")
+        return None
+
+
+def _save_cached_matcher(cache_dir, version, matcher):
+    path = _index_path(cache_dir, version)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first so concurrent workers never read a partial index
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(matcher.to_dict(), f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not cache skill index: {e}")
+
+
+def load_taxonomy(path=None, cache_dir=INDEX_CACHE_DIR):
+    """Load a taxonomy file, reusing its compiled matcher from the disk cache"""
+    path = path or os.environ.get('RESUMEIQ_SKILL_TAXONOMY', DEFAULT_TAXONOMY_PATH)
+    version = file_sha256(path)
+
+    with open(path, encoding='utf-8') as f:
+        skills, categories, category_names, synonyms, education_keywords = _parse_taxonomy(json.load(f))
+
+    matcher = _load_cached_matcher(cache_dir, version) if cache_dir else None
+    if matcher is None:
+        matcher = SkillMatcher(skills, synonyms)
+        if cache_dir:
+            _save_cached_matcher(cache_dir, version, matcher)
+
+    return SkillTaxonomy(skills, categories, category_names, synonyms, education_keywords,
+                         version, matcher)
+
+
+def get_taxonomy():
+    """Return the process-wide default taxonomy, loading it on first use"""
+    global _default_taxonomy
+    if _default_taxonomy is None:
+        with _default_lock:
+            if _default_taxonomy is None:
+                _default_taxonomy = load_taxonomy()
+    return _default_taxonomy
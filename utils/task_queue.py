@@ -0,0 +1,138 @@
+"""
+Background queue for resume analysis.
+
+Uploads are recorded as rows in the analysis_jobs table and analyzed by a
+small thread pool, so the page that enqueued them returns immediately and
+polls the row for status, the stage reached and partial results. Because
+the queue lives in SQLite, queued and finished work survives Streamlit
+reruns and server restarts: jobs a stopped process left running are put
+back in the queue when the next AnalysisQueue starts. This assumes one
+application process per database file.
+
+Uploads that are not kept (guests, recruiter previews) can be analyzed
+straight from memory with enqueue_buffer. Those jobs live only in this
+process, like the upload itself.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from database.connection import DEFAULT_DB_PATH
+from database.db_manager import DatabaseManager
+from utils.resume_parser import analyze_resume
+
+DEFAULT_WORKERS = 2
+
+# Finished jobs are deleted after this many days
+JOB_RETENTION_DAYS = 7
+
+# In-memory jobs kept for polling; the oldest are dropped first
+MAX_MEMORY_JOBS = 50
+
+
+class AnalysisQueue:
+    """Runs queued analysis jobs on a thread pool"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, workers=DEFAULT_WORKERS):
+        self.db = DatabaseManager(db_path)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis-worker")
+        self._lock = threading.Lock()
+        self._closed = False
+        self._memory_jobs = OrderedDict()
+
+        self.db.delete_finished_analysis_jobs(JOB_RETENTION_DAYS)
+        self.db.requeue_running_analysis_jobs()
+        for _ in range(self.db.count_queued_analysis_jobs()):
+            self._executor.submit(self._run_next)
+
+    def enqueue(self, file_path, filename=None, user_id=None, resume_id=None, content_hash=None):
+        """Queue a resume file for analysis and return the job ID right away
+
+        With a resume_id the analysis is also saved for that resume, as
+        analyze_resume does; without one (guests, recruiter previews) only
+        the job row holds the result. content_hash, the file's SHA-256 if
+        already known (e.g. from store_upload), spares the worker hashing it.
+        """
+        job_id = self.db.create_analysis_job(file_path, filename, user_id, resume_id, content_hash)
+        with self._lock:
+            if not self._closed:
+                self._executor.submit(self._run_next)
+        return job_id
+
+    def enqueue_buffer(self, source, filename):
+        """Queue an in-memory upload (bytes-like or binary stream) for analysis
+
+        Nothing is written to disk or to the database. Returns a string job
+        ID that get_job accepts.
+        """
+        job_id = f"mem-{uuid.uuid4().hex}"
+        job = {
+            'id': job_id, 'user_id': None, 'resume_id': None, 'filename': filename, 'file_path': None,
+            'status': 'queued', 'stage': None, 'partial': None, 'result': None, 'error': None,
+        }
+        with self._lock:
+            self._memory_jobs[job_id] = job
+            while len(self._memory_jobs) > MAX_MEMORY_JOBS:
+                self._memory_jobs.popitem(last=False)
+            if not self._closed:
+                self._executor.submit(self._run_memory_job, job, source)
+        return job_id
+
+    def get_job(self, job_id):
+        """Return a job's status, stage, partial results and (when done) its analysis"""
+        if isinstance(job_id, str):
+            with self._lock:
+                job = self._memory_jobs.get(job_id)
+                return dict(job) if job is not None else None
+        return self.db.get_analysis_job(job_id)
+
+    def get_user_jobs(self, user_id, limit=10):
+        return self.db.get_user_analysis_jobs(user_id, limit)
+
+    def _run_next(self):
+        try:
+            job = self.db.claim_analysis_job()
+        except Exception as e:
+            print(f"Error claiming analysis job: {e}")
+            return
+        if job is None:
+            return
+
+        def progress(stage, partial):
+            self.db.update_analysis_job_progress(job['id'], stage, partial)
+
+        result, error = self._analyze(job['file_path'], job['resume_id'], progress,
+                                      content_hash=job['content_hash'])
+        self.db.finish_analysis_job(job['id'], result=result, error=error)
+
+    def _run_memory_job(self, job, source):
+        def progress(stage, partial):
+            with self._lock:
+                job.update(stage=stage, partial=partial)
+
+        with self._lock:
+            job['status'] = 'running'
+        result, error = self._analyze(source, progress=progress, filename=job['filename'])
+        with self._lock:
+            job.update(status='failed' if error else 'done', result=result, error=error)
+
+    @staticmethod
+    def _analyze(source, resume_id=None, progress=None, filename=None, content_hash=None):
+        """Run analyze_resume; returns (analysis or None, error message or None)"""
+        try:
+            analysis = analyze_resume(source, resume_id, progress=progress, filename=filename,
+                                      content_hash=content_hash)
+        except Exception as e:
+            print(f"Error analyzing {filename or source}: {e}")
+            return None, str(e)
+
+        if analysis["status"] == "success":
+            return analysis, None
+        return analysis, analysis["message"]
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs; queued ones stay in the table for the next start"""
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,81 @@
+"""
+Handling of uploaded resume files.
+
+Uploads that are kept (a logged-in user's resumes, API uploads with a
+user) are streamed to disk in fixed-size chunks while their SHA-256 is
+computed, so the file is never held twice in memory and never re-read
+for hashing: the digest goes along with the file to analyze_resume, which
+uses it as the analysis cache key. Uploads that are only analyzed (guests, recruiter previews)
+stay in memory: the upload itself is handed to the text extractors,
+which accept file paths, bytes-like buffers and binary streams.
+"""
+import hashlib
+import os
+import threading
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds the size limit"""
+
+    def __init__(self, max_bytes=MAX_UPLOAD_BYTES):
+        super().__init__(f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+        self.max_bytes = max_bytes
+
+
+def upload_size(source):
+    """Size in bytes of an uploaded stream, or None if it cannot be told without reading"""
+    size = getattr(source, "size", None)
+    if size is not None:
+        return size
+    try:
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def check_upload_size(source, max_bytes=MAX_UPLOAD_BYTES):
+    """Raise UploadTooLarge if an in-memory upload is over the limit"""
+    size = upload_size(source)
+    if size is not None and size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+
+def save_upload(source, file_path, max_bytes=MAX_UPLOAD_BYTES):
+    """Stream a binary file object to file_path; returns (size, sha256 hex digest)
+
+    The data is written to a temporary file next to file_path and moved into
+    place once complete, so readers never see a partial file. Raises
+    UploadTooLarge (leaving nothing behind) once more than max_bytes are read.
+    """
+    check_upload_size(source, max_bytes)
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+    digest = hashlib.sha256()
+    size = 0
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        with open(tmp_path, "wb") as f:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(chunk)
+                f.write(chunk)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return size, digest.hexdigest()
@@ -0,0 +1,63 @@
+"""
+On-demand word cloud images cached by resume content hash.
+
+Word clouds are rendered only when a view asks for one and stored as
+cache/wordclouds/<sha256>.png. The janitor (utils/janitor.py) evicts them
+oldest-first once an image passes MAX_AGE_SECONDS or the directory exceeds
+MAX_CACHE_BYTES; reading a cached image counts as a use.
+"""
+import os
+import threading
+
+from utils.profiling import StageTimer, emit_timings
+from utils.resume_parser import generate_wordcloud
+
+WORDCLOUD_DIR = os.path.join('cache', 'wordclouds')
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+MAX_AGE_SECONDS = 7 * 24 * 3600
+
+_render_lock = threading.Lock()
+
+
+def wordcloud_path(content_hash, cache_dir=WORDCLOUD_DIR):
+    return os.path.join(cache_dir, f"{content_hash}.png")
+
+
+def get_cached_wordcloud(content_hash, cache_dir=WORDCLOUD_DIR):
+    """Return the path of an already rendered word cloud, or None"""
+    path = wordcloud_path(content_hash, cache_dir)
+    try:
+        # Refresh the modification time so eviction treats it as recently used
+        os.utime(path)
+    except OSError:
+        return None
+    return path
+
+
+def get_or_create_wordcloud(content_hash, load_text, cache_dir=WORDCLOUD_DIR):
+    """Return the word cloud for a resume, rendering it if it is not cached yet
+
+    load_text is only called on a cache miss, so callers can defer the
+    (possibly expensive) text extraction until it is really needed. The
+    render is reported to the metrics sinks as the generate_wordcloud stage.
+    """
+    path = get_cached_wordcloud(content_hash, cache_dir)
+    if path:
+        return path
+
+    with _render_lock:
+        # Another session may have rendered it while we waited
+        path = get_cached_wordcloud(content_hash, cache_dir)
+        if path:
+            return path
+
+        text = load_text()
+        if not text:
+            return None
+        timer = StageTimer()
+        with timer.stage("generate_wordcloud"):
+            path = generate_wordcloud(text, f"{content_hash}.png", output_dir=cache_dir)
+
+    emit_timings(timer)
+    return path
+